@@ -3,11 +3,19 @@ TorqueTrackerApp — top-level orchestrator.
 Owns the database, controllers, and current session state (user / vehicle).
 Views call back into this object to navigate or mutate state.
 """
+import logging
+import os
 import tkinter as tk
 from tkinter import ttk
 
 from database import Database
-from controllers import UserController, VehicleController, MileageController
+from controllers import (
+    UserController, VehicleController, MileageController,
+    ImportController, ExportController, PurgeController,
+)
+from views.background import run_in_background
+
+log = logging.getLogger(__name__)
 
 
 # ── shared colour palette ─────────────────────────────────────────────────────
@@ -92,11 +100,17 @@ class TorqueTrackerApp:
 
         apply_global_styles()
 
-        # Persistence
-        self.db = Database()
+        # Persistence (WAL so background readers never block the UI's writes).
+        # TORQUE_TRACKER_SLOW_MS=<ms> turns on query instrumentation.
+        slow_ms = os.environ.get("TORQUE_TRACKER_SLOW_MS")
+        self.db = Database(wal=True, slow_query_ms=float(slow_ms) if slow_ms else None)
         self.users  = UserController(self.db)
         self.vehicles = VehicleController(self.db)
         self.mileage  = MileageController(self.db)
+        self.imports  = ImportController(self.db)
+        self.exports  = ExportController(self.db)
+        self.purges   = PurgeController(self.db)
+        self._purging = False
 
         # Session state
         self.current_user: object    = None
@@ -104,6 +118,9 @@ class TorqueTrackerApp:
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.show_login()
+        # Finish any purge an earlier session did not get to complete.
+        self.purge_deleted()
+        self.prepare_passwords()
 
     # ── navigation ────────────────────────────────────────────────────────────
 
@@ -131,6 +148,60 @@ class TorqueTrackerApp:
         self.current_vehicle = None
         self.show_login()
 
+    # ── background purge ──────────────────────────────────────────────────────
+
+    def purge_deleted(self):
+        """Purge deleted users/vehicles off the Tk thread; call after marking a delete."""
+        if self._purging or not self.purges.pending():
+            return
+        self._purging = True
+
+        def on_progress(logs, fraction):
+            log.debug("Purging deleted data: %d logs (%.0f%%)", logs, fraction * 100)
+
+        def on_done(result):
+            self._purging = False
+            log.info("Purged %d logs, %d vehicles, %d users",
+                     result.logs, result.vehicles, result.users)
+            self.purge_deleted()  # anything deleted since the last pass
+
+        def on_error(exc):
+            self._purging = False
+            log.error("Purge of deleted data failed (resumes on next start): %s", exc)
+
+        run_in_background(self.root, self.purges.purge,
+                          on_done=on_done, on_error=on_error, on_progress=on_progress)
+
+    # ── password upkeep ───────────────────────────────────────────────────────
+
+    def prepare_passwords(self):
+        """
+        One-time jobs, off the Tk thread: pick the PBKDF2 cost for this machine,
+        then hash any plaintext passwords left from before hashing existed.
+        """
+        if self.users.is_calibrated() and self.users.legacy_passwords_hashed():
+            return
+
+        def work(progress):
+            iterations = None if self.users.is_calibrated() else self.users.calibrate()
+            return iterations, self.users.hash_legacy_passwords(progress)
+
+        def on_progress(done, total):
+            log.debug("Hashing legacy passwords: %d / %d", done, total)
+
+        def on_done(result):
+            iterations, hashed = result
+            if iterations:
+                log.info("Password hashing calibrated to %d PBKDF2 iterations", iterations)
+            if hashed:
+                log.info("Hashed %d legacy plaintext passwords", hashed)
+
+        def on_error(exc):
+            log.warning("Password upkeep failed (retried on next start): %s", exc)
+
+        run_in_background(self.root, work, on_done=on_done, on_error=on_error, on_progress=on_progress)
+
     def _on_close(self):
+        self.users.close()
         self.db.close()
         self.root.destroy()
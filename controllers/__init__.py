@@ -2,5 +2,11 @@
 from controllers.user_controller import UserController
 from controllers.vehicle_controller import VehicleController
 from controllers.mileage_controller import MileageController
+from controllers.import_controller import ImportController
+from controllers.export_controller import ExportController
+from controllers.purge_controller import PurgeController
 
-__all__ = ["UserController", "VehicleController", "MileageController"]
+__all__ = [
+    "UserController", "VehicleController", "MileageController",
+    "ImportController", "ExportController", "PurgeController",
+]
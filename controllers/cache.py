@@ -0,0 +1,77 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+# Per-database counter bumped by invalidate_all(); every cache on that database
+# drops its entries when it changes, as it does for PRAGMA data_version.
+_shared_generations = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def invalidate_all(db):
+    """Drop every controller's cache on `db`, for writes that cross controllers."""
+    with _shared_lock:
+        _shared_generations[db] = _shared_generations.get(db, 0) + 1
+
+
+def _shared_generation(db) -> int:
+    with _shared_lock:
+        return _shared_generations.get(db, 0)
+
+
+class QueryCache:
+    """
+    Bounded LRU of controller reads. Keys are tuples such as
+    ("for_user", user_id); invalidate() with a shorter tuple drops every key
+    it prefixes. The whole cache is dropped when PRAGMA data_version shows that
+    another connection (e.g. a second app instance) committed a change, or when
+    invalidate_all() is called for a write that changes another controller's
+    data (deleting a user hides their vehicles).
+
+    Cached values are shared between callers, so they must be immutable: the
+    models are frozen dataclasses and list results are copied on the way out.
+    """
+
+    def __init__(self, db, maxsize: int = 256):
+        self.db = db
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._data_version = None
+
+    def get(self, key: tuple, loader):
+        self._check_external_changes()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            generation = (self._generation, _shared_generation(self.db))
+
+        value = loader()
+
+        with self._lock:
+            # Skip the store if a write invalidated the cache while we loaded.
+            if generation == (self._generation, _shared_generation(self.db)):
+                self._entries[key] = value
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *prefix):
+        with self._lock:
+            self._generation += 1
+            n = len(prefix)
+            for key in [k for k in self._entries if k[:n] == prefix]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _check_external_changes(self):
+        version = (self.db.data_version(), _shared_generation(self.db))
+        if version != self._data_version:
+            self.clear()
+            self._data_version = version
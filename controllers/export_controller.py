@@ -0,0 +1,125 @@
+"""
+Streaming export of users, vehicles and mileage logs to CSV or JSON Lines.
+
+Rows are read from a cursor in batches and written straight to the output
+file, so memory use does not depend on the size of the export. Output goes to
+a temporary file that replaces the destination only when the export succeeds.
+The log export uses the same column names the importer reads.
+"""
+import csv
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from models.mileage_log import parse_log_date
+
+FORMATS = ("csv", "jsonl")
+SCOPES = ("all", "user", "vehicle")
+
+LOG_COLUMNS = ("id", "vehicle_id", "vehicle", "username", "date", "odometer", "notes", "created_at")
+VEHICLE_COLUMNS = ("id", "user_id", "username", "name", "make", "model", "year", "license_plate", "created_at")
+USER_COLUMNS = ("id", "username", "is_admin", "created_at")  # never password hashes
+
+
+def detect_format(path) -> str:
+    return "jsonl" if Path(path).suffix.lower() in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+class ExportController:
+    def __init__(self, db):
+        self.db = db
+
+    def export_logs(self, dest, scope: str = "all", scope_id: int = None,
+                    start=None, end=None, fmt: str = None, progress=None) -> int:
+        """Export mileage logs, optionally limited to a user/vehicle and date range."""
+        where, params = self._scope_filter(scope, scope_id)
+        if start is not None:
+            where.append("m.date >= ?")
+            params.append(parse_log_date(start).isoformat())
+        if end is not None:
+            where.append("m.date <= ?")
+            params.append(parse_log_date(end).isoformat())
+        # Orders that each scope's plan already produces, so SQLite never sorts.
+        order = "v.name, v.id, m.date, m.id" if scope == "user" else "m.vehicle_id, m.date, m.id"
+        query = f"""
+            SELECT m.id, m.vehicle_id, v.name AS vehicle, u.username, m.date,
+                   m.odometer_reading AS odometer, m.notes, m.created_at
+            FROM mileage_logs m
+            JOIN vehicles v ON v.id = m.vehicle_id
+            JOIN users u ON u.id = v.user_id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {order}
+        """
+        # Upper bound for progress, from the trigger-maintained counts.
+        stat_where, stat_params = self._scope_filter(scope, scope_id)
+        row = self.db.fetchone(
+            "SELECT COALESCE(SUM(s.log_count), 0) AS n FROM vehicle_stats s"
+            " JOIN vehicles v ON v.id = s.vehicle_id"
+            + (" WHERE " + " AND ".join(stat_where) if stat_where else ""),
+            tuple(stat_params),
+        )
+        return self._write(dest, fmt, LOG_COLUMNS, self.db.iter_rows(query, tuple(params)),
+                           row["n"], progress)
+
+    def export_vehicles(self, dest, scope: str = "all", scope_id: int = None,
+                        fmt: str = None, progress=None) -> int:
+        where, params = self._scope_filter(scope, scope_id)
+        query = f"""
+            SELECT v.id, v.user_id, u.username, v.name, v.make, v.model, v.year,
+                   v.license_plate, v.created_at
+            FROM vehicles v JOIN users u ON u.id = v.user_id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY v.user_id, v.name
+        """
+        return self._write(dest, fmt, VEHICLE_COLUMNS, self.db.iter_rows(query, tuple(params)),
+                           None, progress)
+
+    def export_users(self, dest, fmt: str = None, progress=None) -> int:
+        query = ("SELECT id, username, is_admin, created_at FROM users"
+                 " WHERE deleted_at IS NULL ORDER BY username")
+        return self._write(dest, fmt, USER_COLUMNS, self.db.iter_rows(query), None, progress)
+
+    # ── helpers ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _scope_filter(scope, scope_id):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown export scope '{scope}'.")
+        # Vehicles waiting to be purged are already gone as far as users can tell.
+        if scope == "all":
+            return ["v.deleted_at IS NULL"], []
+        if scope_id is None:
+            raise ValueError(f"Export scope '{scope}' needs an id.")
+        return ["v.deleted_at IS NULL", ("v.user_id = ?" if scope == "user" else "v.id = ?")], [scope_id]
+
+    @staticmethod
+    def _write(dest, fmt, columns, rows, total, progress, report_every: int = 5000) -> int:
+        dest = Path(dest)
+        fmt = fmt or detect_format(dest)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'.")
+
+        fd, tmp = tempfile.mkstemp(prefix=f".{dest.name}.", dir=dest.parent or ".")
+        count = 0
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                if fmt == "csv":
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    emit = lambda r: writer.writerow(tuple(r))
+                else:
+                    emit = lambda r: f.write(json.dumps(dict(zip(columns, tuple(r))), ensure_ascii=False) + "\n")
+                for row in rows:
+                    emit(row)
+                    count += 1
+                    if progress and count % report_every == 0:
+                        progress(count, min(1.0, count / total) if total else None)
+            os.replace(tmp, dest)
+        except BaseException:
+            rows.close()
+            os.unlink(tmp)
+            raise
+        if progress:
+            progress(count, 1.0)
+        return count
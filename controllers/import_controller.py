@@ -0,0 +1,208 @@
+"""
+Streaming import of mileage logs from CSV, JSON Lines or JSON array files.
+
+Records flow through a generator pipeline (read → validate → chunk) and each
+chunk is written with one executemany in its own transaction, so memory stays
+constant no matter how large the file is.
+
+Recognised fields (CSV header names or JSON keys):
+    date, odometer (or odometer_reading), notes,
+    vehicle_id or vehicle (a vehicle name, resolved within the importing user)
+"""
+import csv
+import io
+import json
+import math
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from models.mileage_log import parse_log_date
+
+MAX_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)  # first MAX_ERRORS problems
+
+
+def _detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".json":
+        return "json"
+    return "csv"
+
+
+def _iter_json_array(text, block_size: int = 1 << 16):
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf, started, eof = "", False, False
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if not started and buf:
+            if buf[0] != "[":
+                raise ValueError("JSON import expects a top-level array.")
+            buf, started = buf[1:].lstrip(), True
+            continue
+        if started and buf.startswith("]"):
+            return
+        if buf:
+            try:
+                obj, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                buf = buf[end:]
+                continue
+        if eof:
+            return
+        chunk = text.read(block_size)
+        eof = not chunk
+        buf += chunk
+
+
+class ImportController:
+    CHUNK_SIZE = 5000
+
+    def __init__(self, db):
+        self.db = db
+
+    def import_logs(self, path, user_id: int = None, vehicle_id: int = None,
+                    fmt: str = None, progress=None, chunk_size: int = None) -> ImportResult:
+        """
+        Import every record of `path`. With vehicle_id all rows go to that
+        vehicle; otherwise each row names its vehicle, restricted to user_id's
+        vehicles when given; a name that matches several vehicles is an error.
+        progress(imported, skipped, fraction) is called after every chunk.
+        Raises ValueError if vehicle_id is not a live vehicle (of user_id).
+        """
+        path = Path(path)
+        fmt = fmt or _detect_format(path)
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        result = ImportResult()
+        by_id, by_name = self._vehicle_lookup(user_id)
+        if vehicle_id is not None and vehicle_id not in by_id:
+            raise ValueError(f"Unknown vehicle id {vehicle_id}.")
+        total_bytes = max(1, path.stat().st_size)
+
+        with open(path, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            rows = self._validate(self._read(text, fmt), result, vehicle_id, by_id, by_name)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                self.db.executemany(
+                    "INSERT INTO mileage_logs (vehicle_id, odometer_reading, date, day, notes)"
+                    " VALUES (?,?,?,?,?)",
+                    chunk,
+                )
+                result.imported += len(chunk)
+                if progress:
+                    progress(result.imported, result.skipped, min(1.0, raw.tell() / total_bytes))
+        if progress:
+            progress(result.imported, result.skipped, 1.0)
+        return result
+
+    # ── pipeline ──────────────────────────────────────────────────────────────
+
+    def _vehicle_lookup(self, user_id):
+        if user_id is None:
+            rows = self.db.fetchall("SELECT id, name FROM vehicles WHERE deleted_at IS NULL")
+        else:
+            rows = self.db.fetchall(
+                "SELECT id, name FROM vehicles WHERE user_id = ? AND deleted_at IS NULL", (user_id,)
+            )
+        by_id = {r["id"] for r in rows}
+        by_name = {}
+        for r in rows:
+            name = r["name"].strip().lower()
+            # A name shared by several vehicles (other users', usually) maps to None.
+            by_name[name] = None if name in by_name else r["id"]
+        return by_id, by_name
+
+    @staticmethod
+    def _read(text, fmt):
+        """
+        Yield (record number, dict) pairs. A record that cannot be parsed is
+        yielded as (record number, ValueError) so it is skipped and reported
+        like any other invalid record.
+        """
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            while True:
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    # line_num has not counted the bad line yet.
+                    yield reader.line_num + 1, ValueError(f"malformed CSV: {e}")
+                    continue
+                yield reader.line_num, {k.strip().lower(): v for k, v in record.items() if k}
+        elif fmt == "jsonl":
+            for n, line in enumerate(text, start=1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        record = ValueError(f"malformed JSON: {e.msg}")
+                    yield n, record
+        elif fmt == "json":
+            # An array cannot be resynchronised after a bad element, so that
+            # element ends the import.
+            n = 0
+            try:
+                for n, record in enumerate(_iter_json_array(text), start=1):
+                    yield n, record
+            except json.JSONDecodeError as e:
+                yield n + 1, ValueError(f"malformed JSON: {e.msg}; the rest of the file was not read")
+        else:
+            raise ValueError(f"Unknown import format '{fmt}'.")
+
+    @staticmethod
+    def _validate(records, result, vehicle_id, by_id, by_name):
+        """Yield insert tuples; invalid records are counted and skipped."""
+        for n, rec in records:
+            try:
+                if isinstance(rec, ValueError):
+                    raise rec
+                if not isinstance(rec, dict):
+                    raise ValueError("expected an object")
+                vid = vehicle_id
+                if vid is None:
+                    if rec.get("vehicle_id") not in (None, ""):
+                        vid = int(rec["vehicle_id"])
+                        if vid not in by_id:
+                            raise ValueError(f"unknown vehicle id {vid}")
+                    else:
+                        name = str(rec.get("vehicle") or "").strip().lower()
+                        if name not in by_name:
+                            raise ValueError(f"unknown vehicle '{rec.get('vehicle', '')}'")
+                        vid = by_name[name]
+                        if vid is None:
+                            raise ValueError(
+                                f"ambiguous vehicle name '{rec.get('vehicle', '')}', pass --user or give vehicle_id"
+                            )
+                odo = rec.get("odometer", rec.get("odometer_reading"))
+                odometer = float(str(odo).replace(",", "")) if odo not in (None, "") else None
+                if odometer is None:
+                    raise ValueError("odometer reading is required")
+                if not math.isfinite(odometer):
+                    raise ValueError(f"odometer reading '{odo}' is not a number")
+                if odometer < 0:
+                    raise ValueError("odometer reading cannot be negative")
+                day = parse_log_date(rec.get("date"))
+            except (ValueError, TypeError) as e:
+                result.skipped += 1
+                if len(result.errors) < MAX_ERRORS:
+                    result.errors.append(f"record {n}: {e}")
+                continue
+            yield (vid, odometer, day.isoformat(), day.toordinal(), str(rec.get("notes") or "").strip())
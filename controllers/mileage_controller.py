@@ -1,4 +1,20 @@
-from models.mileage_log import MileageLog
+import datetime
+import re
+from itertools import groupby
+
+from models.dashboard import DashboardSnapshot, VehicleSummary
+from models.mileage_log import LogPage, MileageLog, NoteHit, PeriodStats, parse_log_date
+
+# Map a day number (date.toordinal()) to the first day of its period.
+_PERIOD_START = {
+    "day":   lambda d: d,
+    "week":  lambda d: d - (d - 1) % 7,  # ordinal 1 is a Monday
+    "month": lambda d: datetime.date.fromordinal(d).replace(day=1).toordinal(),
+    "year":  lambda d: datetime.date.fromordinal(d).replace(month=1, day=1).toordinal(),
+}
+
+# Search terms as the FTS5 unicode61 tokenizer sees them.
+_TERM = re.compile(r"\w+")
 
 
 class MileageController:
@@ -7,11 +23,142 @@ class MileageController:
 
     def get_logs(self, vehicle_id: int, limit: int = None) -> list[MileageLog]:
         q = "SELECT * FROM mileage_logs WHERE vehicle_id = ? ORDER BY date DESC, id DESC"
+        params = (vehicle_id,)
         if limit:
-            q += f" LIMIT {int(limit)}"
-        rows = self.db.fetchall(q, (vehicle_id,))
+            q += " LIMIT ?"
+            params += (int(limit),)
+        rows = self.db.fetchall(q, params)
         return [MileageLog.from_row(r) for r in rows]
 
+    def get_logs_page(self, vehicle_id: int, after: tuple = None, before: tuple = None,
+                      limit: int = 50) -> LogPage:
+        """
+        Keyset pagination over (date, id), newest first. Pass a page's
+        next_cursor as after= to go back in time, or its prev_cursor as before=
+        to come forward. Each page is one index seek plus `limit` rows, so it
+        costs the same at any depth.
+        """
+        limit = max(1, int(limit))
+        if before is not None:
+            rows = self.db.fetchall(
+                "SELECT * FROM mileage_logs WHERE vehicle_id = ? AND (date, id) > (?, ?)"
+                " ORDER BY date ASC, id ASC LIMIT ?",
+                (vehicle_id, before[0], before[1], limit + 1),
+            )
+            has_newer, has_older = len(rows) > limit, True
+            rows = rows[:limit][::-1]
+        else:
+            q = "SELECT * FROM mileage_logs WHERE vehicle_id = ?"
+            params = (vehicle_id,)
+            if after is not None:
+                q += " AND (date, id) < (?, ?)"
+                params += (after[0], after[1])
+            rows = self.db.fetchall(q + " ORDER BY date DESC, id DESC LIMIT ?", params + (limit + 1,))
+            has_newer, has_older = after is not None, len(rows) > limit
+            rows = rows[:limit]
+
+        logs = [MileageLog.from_row(r) for r in rows]
+        return LogPage(
+            logs=logs,
+            next_cursor=logs[-1].cursor if logs and has_older else None,
+            prev_cursor=logs[0].cursor if logs and has_newer else None,
+            total=self.log_count(vehicle_id),
+        )
+
+    def cursor_at(self, vehicle_id: int, offset: int) -> tuple[str, int] | None:
+        """
+        Cursor of the log `offset` places from the newest (0 = newest), or None
+        past the end. Walks the (vehicle_id, date, id) index without touching
+        the table, so jumping deep into a long history stays cheap.
+        """
+        row = self.db.fetchone(
+            "SELECT date, id FROM mileage_logs WHERE vehicle_id = ?"
+            " ORDER BY date DESC, id DESC LIMIT 1 OFFSET ?",
+            (vehicle_id, max(0, int(offset))),
+        )
+        return (row["date"], row["id"]) if row else None
+
+    def get_logs_between(self, vehicle_id: int, start, end) -> list[MileageLog]:
+        """Logs dated start..end inclusive, newest first (range scan on the date index)."""
+        start, end = parse_log_date(start), parse_log_date(end)
+        rows = self.db.fetchall(
+            "SELECT * FROM mileage_logs WHERE vehicle_id = ? AND date BETWEEN ? AND ?"
+            " ORDER BY date DESC, id DESC",
+            (vehicle_id, start.isoformat(), end.isoformat()),
+        )
+        return [MileageLog.from_row(r) for r in rows]
+
+    def period_stats(self, vehicle_id: int, start, end, period: str = "month") -> list[PeriodStats]:
+        """
+        Entry count and odometer range per day/week/month/year between start and
+        end inclusive. Reads (day, odometer) in index order from
+        idx_mileage_logs_vehicle_day, so no table rows and no sort are involved.
+        """
+        if period not in _PERIOD_START:
+            raise ValueError(f"Unknown period '{period}'.")
+        start, end = parse_log_date(start), parse_log_date(end)
+        rows = self.db.fetchall(
+            "SELECT day, odometer_reading FROM mileage_logs"
+            " WHERE vehicle_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (vehicle_id, start.toordinal(), end.toordinal()),
+        )
+        bucket = _PERIOD_START[period]
+        result = []
+        for first_day, group in groupby(rows, key=lambda r: bucket(r["day"])):
+            readings = [r["odometer_reading"] for r in group]
+            result.append(PeriodStats(
+                start=datetime.date.fromordinal(first_day),
+                entries=len(readings),
+                min_odometer=min(readings),
+                max_odometer=max(readings),
+            ))
+        return result
+
+    def search_notes(self, user_id: int, query: str, limit: int = 100) -> list[NoteHit]:
+        """
+        Logs across all of a user's vehicles whose notes contain every word of
+        `query`, best match first (bm25). The last word also matches as a
+        prefix, so results keep up while the user is still typing.
+        """
+        terms = _TERM.findall(query)
+        if not terms:
+            return []
+        if not self.db.has_fts:
+            return self._search_notes_like(user_id, terms, limit)
+        match = " ".join(f'"{t}"' for t in terms) + "*"
+        rows = self.db.fetchall(
+            """
+            SELECT m.*, v.name AS vehicle_name, f.rank AS rank,
+                   snippet(mileage_logs_fts, 0, '[', ']', '…', 12) AS snippet
+            FROM mileage_logs_fts f
+            JOIN mileage_logs m ON m.id = f.rowid
+            JOIN vehicles v ON v.id = m.vehicle_id
+            WHERE mileage_logs_fts MATCH ? AND v.user_id = ? AND v.deleted_at IS NULL
+            ORDER BY f.rank
+            LIMIT ?
+            """,
+            (match, user_id, int(limit)),
+        )
+        return [NoteHit.from_row(r) for r in rows]
+
+    def _search_notes_like(self, user_id: int, terms: list[str], limit: int) -> list[NoteHit]:
+        """Unranked substring search for SQLite builds without FTS5; newest first."""
+        # Terms are word characters only, so "_" is the one LIKE wildcard to escape.
+        like = " AND ".join(["m.notes LIKE ? ESCAPE '\\'"] * len(terms))
+        patterns = ["%" + t.replace("_", "\\_") + "%" for t in terms]
+        rows = self.db.fetchall(
+            f"""
+            SELECT m.*, v.name AS vehicle_name, NULL AS rank, m.notes AS snippet
+            FROM vehicles v
+            JOIN mileage_logs m ON m.vehicle_id = v.id
+            WHERE v.user_id = ? AND v.deleted_at IS NULL AND {like}
+            ORDER BY m.date DESC, m.id DESC
+            LIMIT ?
+            """,
+            (user_id, *patterns, int(limit)),
+        )
+        return [NoteHit.from_row(r) for r in rows]
+
     def get(self, log_id: int) -> MileageLog | None:
         row = self.db.fetchone("SELECT * FROM mileage_logs WHERE id = ?", (log_id,))
         return MileageLog.from_row(row) if row else None
@@ -19,11 +166,10 @@ class MileageController:
     def add(self, vehicle_id: int, odometer: float, date: str, notes: str = "") -> MileageLog:
         if odometer < 0:
             raise ValueError("Odometer reading cannot be negative.")
-        if not date:
-            raise ValueError("Date is required.")
+        parsed = parse_log_date(date)
         cursor = self.db.execute(
-            "INSERT INTO mileage_logs (vehicle_id, odometer_reading, date, notes) VALUES (?,?,?,?)",
-            (vehicle_id, odometer, date, notes),
+            "INSERT INTO mileage_logs (vehicle_id, odometer_reading, date, day, notes) VALUES (?,?,?,?,?)",
+            (vehicle_id, odometer, parsed.isoformat(), parsed.toordinal(), notes),
         )
         return self.get(cursor.lastrowid)
 
@@ -31,23 +177,45 @@ class MileageController:
         self.db.execute("DELETE FROM mileage_logs WHERE id = ?", (log_id,))
 
     # ── stats ─────────────────────────────────────────────────────────────────
+    # Read from vehicle_stats, which triggers on mileage_logs keep exact.
 
     def latest_odometer(self, vehicle_id: int) -> float | None:
         row = self.db.fetchone(
-            "SELECT odometer_reading FROM mileage_logs WHERE vehicle_id = ? ORDER BY date DESC, id DESC LIMIT 1",
-            (vehicle_id,),
+            "SELECT latest_odometer FROM vehicle_stats WHERE vehicle_id = ?", (vehicle_id,)
         )
-        return row["odometer_reading"] if row else None
+        return row["latest_odometer"] if row else None
 
     def total_miles(self, vehicle_id: int) -> float:
         row = self.db.fetchone(
-            "SELECT MAX(odometer_reading) - MIN(odometer_reading) AS total FROM mileage_logs WHERE vehicle_id = ?",
+            "SELECT max_odometer - min_odometer AS total FROM vehicle_stats WHERE vehicle_id = ?",
             (vehicle_id,),
         )
         return row["total"] if row and row["total"] is not None else 0.0
 
     def log_count(self, vehicle_id: int) -> int:
         row = self.db.fetchone(
-            "SELECT COUNT(*) AS cnt FROM mileage_logs WHERE vehicle_id = ?", (vehicle_id,)
+            "SELECT log_count AS cnt FROM vehicle_stats WHERE vehicle_id = ?", (vehicle_id,)
         )
         return row["cnt"] if row else 0
+
+    def dashboard_snapshot(self, user_id: int, vehicle_id: int = None, recent: int = 6) -> DashboardSnapshot:
+        """
+        All vehicles for a user with their stats in one joined query, plus the
+        most recent logs of the selected vehicle.
+        """
+        rows = self.db.fetchall(
+            """
+            SELECT v.*, s.log_count, s.min_odometer, s.max_odometer, s.latest_odometer
+            FROM vehicles v
+            LEFT JOIN vehicle_stats s ON s.vehicle_id = v.id
+            WHERE v.user_id = ? AND v.deleted_at IS NULL
+            ORDER BY v.name
+            """,
+            (user_id,),
+        )
+        summaries = [VehicleSummary.from_row(r) for r in rows]
+        selected = next((s for s in summaries if s.vehicle.id == vehicle_id), None)
+        recent_logs = []
+        if selected and selected.log_count:
+            recent_logs = self.get_logs(vehicle_id, limit=recent)
+        return DashboardSnapshot(vehicles=summaries, selected=selected, recent_logs=recent_logs)
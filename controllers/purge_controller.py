@@ -0,0 +1,82 @@
+"""
+Background purge of users and vehicles marked for deletion.
+
+UserController.delete and VehicleController.delete only set deleted_at, which
+hides the row from every controller query straight away. PurgeController then
+removes the marked vehicles' mileage logs in bounded batches, each in its own
+short transaction so the UI's writes are never held up for long, and finally
+the vehicle and user rows themselves. All progress lives in the database, so a
+purge cut short by a crash or by closing the app carries on with the next run.
+"""
+from dataclasses import dataclass
+
+
+@dataclass
+class PurgeResult:
+    logs: int = 0
+    vehicles: int = 0
+    users: int = 0
+
+
+class PurgeController:
+    BATCH_SIZE = 1000
+
+    def __init__(self, db):
+        self.db = db
+
+    def pending(self) -> bool:
+        row = self.db.fetchone(
+            "SELECT EXISTS (SELECT 1 FROM vehicles WHERE deleted_at IS NOT NULL)"
+            " OR EXISTS (SELECT 1 FROM users WHERE deleted_at IS NOT NULL) AS pending"
+        )
+        return bool(row["pending"])
+
+    def purge(self, progress=None, batch_size: int = None) -> PurgeResult:
+        """
+        Delete everything marked for deletion. progress(logs_deleted, fraction) is
+        called after every batch. Rows marked while the purge runs are picked up
+        before it returns.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        result = PurgeResult()
+        while True:
+            vehicle_ids = [r["id"] for r in self.db.fetchall(
+                "SELECT id FROM vehicles WHERE deleted_at IS NOT NULL ORDER BY deleted_at"
+            )]
+            if not vehicle_ids:
+                break
+            total = result.logs + self.db.fetchone(
+                "SELECT COUNT(*) AS n FROM mileage_logs"
+                " WHERE vehicle_id IN (SELECT id FROM vehicles WHERE deleted_at IS NOT NULL)"
+            )["n"]
+            for vehicle_id in vehicle_ids:
+                while self._purge_batch(vehicle_id, batch_size, result):
+                    if progress:
+                        progress(result.logs, min(1.0, result.logs / total) if total else 1.0)
+
+        # A user goes last, once none of their vehicles are left to cascade.
+        result.users = self.db.execute(
+            "DELETE FROM users WHERE deleted_at IS NOT NULL"
+            " AND NOT EXISTS (SELECT 1 FROM vehicles v WHERE v.user_id = users.id)"
+        ).rowcount
+        if progress:
+            progress(result.logs, 1.0)
+        return result
+
+    def _purge_batch(self, vehicle_id: int, batch_size: int, result: PurgeResult) -> bool:
+        """Delete one batch of a vehicle's logs; False once the vehicle row is gone too."""
+        with self.db.transaction():
+            # Normally dropped at mark time; a stats rebuild could have restored it.
+            self.db.execute("DELETE FROM vehicle_stats WHERE vehicle_id = ?", (vehicle_id,))
+            deleted = self.db.execute(
+                "DELETE FROM mileage_logs WHERE id IN"
+                " (SELECT id FROM mileage_logs WHERE vehicle_id = ? LIMIT ?)",
+                (vehicle_id, batch_size),
+            ).rowcount
+            if deleted:
+                result.logs += deleted
+                return True
+            result.vehicles += self.db.execute(
+                "DELETE FROM vehicles WHERE id = ? AND deleted_at IS NOT NULL", (vehicle_id,)
+            ).rowcount
+            return False
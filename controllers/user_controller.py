@@ -1,42 +1,257 @@
-import hashlib
-import hmac
-import secrets
+import csv
+import json
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
 
-from models.user import User
+import passwords
+from controllers.cache import QueryCache, invalidate_all
+from models.user import User, UserPage
 
+ITERATIONS_SETTING = "pbkdf2_iterations"
+LEGACY_HASHED_SETTING = "legacy_passwords_hashed"
+MAX_ERRORS = 100
+_ADMIN_ROLES = {"admin", "administrator", "1", "true", "yes", "y"}
+_USER_ROLES = {"", "user", "0", "false", "no", "n"}
+_MAX_CHAR = "\U0010ffff"   # sorts after every character, closing a prefix range
+_USER_COLUMNS = "SELECT id, username, is_admin, created_at FROM users"
 
-def _hash_password(password: str) -> str:
-    """Hash a password using PBKDF2-SHA256 with a random salt."""
-    salt = secrets.token_hex(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), 260_000)
-    return f"pbkdf2$sha256${salt}${dk.hex()}"
+# Admin table sort orders. Each key ends in id so it is unique, and each one is
+# the column list of an index on live users, so pages are read in index order.
+USER_SORTS = {
+    "username": ("username COLLATE NOCASE", "id"),
+    "role":     ("is_admin", "username COLLATE NOCASE", "id"),
+    "created":  ("created_at", "id"),
+}
+USER_ROLES = (None, "admin", "user")
 
 
-def _verify_password(stored: str, provided: str) -> bool:
-    """Verify a password. Handles both hashed and legacy plaintext passwords."""
-    if stored and stored.startswith("pbkdf2$sha256$"):
-        parts = stored.split("$")
-        if len(parts) != 4:
-            return False
-        _, _, salt, expected_hash = parts
-        dk = hashlib.pbkdf2_hmac("sha256", provided.encode("utf-8"), salt.encode("utf-8"), 260_000)
-        return hmac.compare_digest(dk.hex(), expected_hash)
-    # Legacy plaintext comparison
-    return stored == provided
+@dataclass
+class ProvisionResult:
+    created: list[User] = field(default_factory=list)
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)  # first MAX_ERRORS problems
+
+
+def _hash_pool(count: int, workers: int = None) -> ProcessPoolExecutor:
+    """
+    Process pool for hashing `count` passwords. pbkdf2_hmac releases the GIL,
+    but separate processes keep a bulk run's CPU load out of the Tk process
+    and scale with the worker count regardless of what else it is doing.
+    """
+    return ProcessPoolExecutor(max_workers=workers or max(1, min(count, os.cpu_count() or 1)))
 
 
 class UserController:
     def __init__(self, db):
         self.db = db
+        self._cache = QueryCache(db)
+        # create / authenticate / set_password hash for a few hundred ms; views
+        # run them here via submit() so the Tk thread never waits on PBKDF2.
+        self._hasher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="password-hash")
+        self._legacy_lock = threading.Lock()
+
+    def submit(self, method, *args, **kwargs) -> Future:
+        """Run a (slow, hashing) controller method on the hash worker."""
+        return self._hasher.submit(method, *args, **kwargs)
+
+    def close(self):
+        self._hasher.shutdown(wait=False, cancel_futures=True)
+
+    # ── hash cost ─────────────────────────────────────────────────────────────
+
+    @property
+    def iterations(self) -> int:
+        """PBKDF2 cost for new hashes: the calibrated value, or the built-in minimum."""
+        return self._cache.get(("setting", ITERATIONS_SETTING), lambda: int(
+            self.db.get_setting(ITERATIONS_SETTING, passwords.MIN_ITERATIONS)
+        ))
+
+    def is_calibrated(self) -> bool:
+        return self.db.get_setting(ITERATIONS_SETTING) is not None
+
+    def calibrate(self, target_seconds: float = passwords.TARGET_SECONDS) -> int:
+        """
+        Measure this machine and store the cost for new hashes. Existing hashes
+        keep their own cost and are upgraded the next time their user logs in.
+        """
+        iterations = passwords.calibrate(target_seconds)
+        self.db.set_setting(ITERATIONS_SETTING, iterations)
+        self._cache.invalidate("setting")
+        return iterations
+
+    # ── legacy plaintext passwords ────────────────────────────────────────────
+
+    def legacy_passwords_hashed(self) -> bool:
+        """True once hash_legacy_passwords has converted every plaintext password."""
+        return self.db.get_setting(LEGACY_HASHED_SETTING) == "1"
+
+    def hash_legacy_passwords(self, progress=None, batch_size: int = 64, workers: int = None) -> int:
+        """
+        Hash every password stored from before hashing existed, spreading the
+        PBKDF2 work over a process pool and writing each batch in one
+        transaction. A missing password becomes the username, as it always
+        has. progress(done, total) is called after every batch. Returns the
+        number of passwords hashed; a no-op once the job has completed.
+        """
+        with self._legacy_lock:
+            if self.legacy_passwords_hashed():
+                return 0
+            rows = self.db.fetchall(
+                "SELECT id, username, password FROM users"
+                " WHERE password IS NULL OR substr(password, 1, ?) <> ?",
+                (len(passwords.PREFIX), passwords.PREFIX),
+            )
+            done = 0
+            if rows:
+                iterations = self.iterations
+                with _hash_pool(len(rows), workers) as pool:
+                    for start in range(0, len(rows), batch_size):
+                        batch = rows[start:start + batch_size]
+                        plain = [passwords.legacy_plaintext(r["password"], r["username"]) for r in batch]
+                        hashed = pool.map(passwords.hash_password, plain, repeat(iterations))
+                        # password IS ? skips rows changed (e.g. a reset) while hashing.
+                        self.db.executemany(
+                            "UPDATE users SET password = ? WHERE id = ? AND password IS ?",
+                            [(h, r["id"], r["password"]) for h, r in zip(hashed, batch)],
+                        )
+                        done += len(batch)
+                        if progress:
+                            progress(done, len(rows))
+                self._cache.clear()
+            self.db.set_setting(LEGACY_HASHED_SETTING, 1)
+            return done
 
     def get_all(self) -> list[User]:
-        rows = self.db.fetchall("SELECT * FROM users ORDER BY username")
+        return list(self._cache.get(("all",), self._load_all))
+
+    def _load_all(self) -> list[User]:
+        rows = self.db.fetchall("SELECT * FROM users WHERE deleted_at IS NULL ORDER BY username")
         return [User.from_row(r) for r in rows]
 
+    def search(self, prefix: str, limit: int = 20) -> list[User]:
+        """
+        Live users whose name starts with `prefix` (ignoring ASCII case), in name
+        order, at most `limit` of them. A range seek on idx_users_username_nocase;
+        password hashes are never read.
+        """
+        prefix = prefix.strip()
+        return list(self._cache.get(("search", prefix, limit),
+                                    lambda: self._load_search(prefix, limit)))
+
+    def _load_search(self, prefix: str, limit: int) -> list[User]:
+        if not prefix:
+            rows = self.db.fetchall(
+                f"{_USER_COLUMNS} WHERE deleted_at IS NULL ORDER BY username COLLATE NOCASE LIMIT ?",
+                (limit,),
+            )
+        else:
+            rows = self.db.fetchall(
+                f"{_USER_COLUMNS} WHERE deleted_at IS NULL"
+                " AND username COLLATE NOCASE >= ? AND username COLLATE NOCASE < ?"
+                " ORDER BY username COLLATE NOCASE LIMIT ?",
+                (prefix, prefix + _MAX_CHAR, limit),
+            )
+        return [User.from_row(r) for r in rows]
+
+    # ── admin table ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def sort_cursor(user: User, sort: str) -> tuple:
+        """A user's position in a USER_SORTS order, usable as a get_page cursor."""
+        if sort == "role":
+            return (int(user.is_admin), user.username, user.id)
+        if sort == "created":
+            return (user.created_at, user.id)
+        return (user.username, user.id)
+
+    def get_page(self, sort: str = "username", descending: bool = False, prefix: str = "",
+                 role: str = None, after: tuple = None, before: tuple = None,
+                 limit: int = 50) -> UserPage:
+        """
+        Keyset pagination over live users in a USER_SORTS order, optionally
+        narrowed to names starting with `prefix` and to one role ("admin" or
+        "user"). after= / before= take sort_cursor() values and return the rows
+        that follow / precede that user in display order. Only the page itself
+        is read; the total comes from the cached count().
+        """
+        keys = USER_SORTS[sort]
+        where, params = self._user_filter(prefix, role, sort)
+        cursor = before if before is not None else after
+        # Walk the index forwards unless exactly one of descending / before= flips it.
+        ascending = descending == (before is not None)
+        if cursor is not None:
+            op = ">" if ascending else "<"
+            # The bare first-column bound lets SQLite seek; the row value breaks ties.
+            where.append(f"{keys[0]} {op}= ? AND ({', '.join(keys)}) {op} ({', '.join('?' * len(keys))})")
+            params += [cursor[0], *cursor]
+        direction = "ASC" if ascending else "DESC"
+        rows = self.db.fetchall(
+            f"{_USER_COLUMNS} WHERE {' AND '.join(where)}"
+            f" ORDER BY {', '.join(f'{k} {direction}' for k in keys)} LIMIT ?",
+            (*params, max(1, int(limit))),
+        )
+        if before is not None:
+            rows = rows[::-1]
+        return UserPage(users=[User.from_row(r) for r in rows], total=self.count(prefix, role))
+
+    def cursor_at(self, offset: int, sort: str = "username", descending: bool = False,
+                  prefix: str = "", role: str = None) -> tuple | None:
+        """sort_cursor() of the user `offset` places into the ordering, or None past the end."""
+        keys = USER_SORTS[sort]
+        where, params = self._user_filter(prefix, role, sort)
+        direction = "DESC" if descending else "ASC"
+        row = self.db.fetchone(
+            f"{_USER_COLUMNS} WHERE {' AND '.join(where)}"
+            f" ORDER BY {', '.join(f'{k} {direction}' for k in keys)} LIMIT 1 OFFSET ?",
+            (*params, max(0, int(offset))),
+        )
+        return self.sort_cursor(User.from_row(row), sort) if row else None
+
+    def count(self, prefix: str = "", role: str = None) -> int:
+        """Live users matching an admin-table filter (cached until a user changes)."""
+        prefix = prefix.strip()
+        return self._cache.get(("count", prefix, role), lambda: self._load_count(prefix, role))
+
+    def _load_count(self, prefix: str, role: str) -> int:
+        where, params = self._user_filter(prefix, role)
+        return self.db.fetchone(
+            f"SELECT COUNT(*) AS n FROM users WHERE {' AND '.join(where)}", tuple(params)
+        )["n"]
+
+    @staticmethod
+    def _user_filter(prefix: str, role: str, sort: str = "username") -> tuple[list, list]:
+        if role not in USER_ROLES:
+            raise ValueError(f"Unknown role '{role}'.")
+        where, params = ["deleted_at IS NULL"], []
+        prefix = prefix.strip()
+        # A unary + keeps a filter's own index out of the plan when the sort
+        # order's index should drive the scan; the filter is then checked per row.
+        if prefix:
+            column = "username" if sort == "username" else "+username"
+            where.append(f"{column} COLLATE NOCASE >= ? AND {column} COLLATE NOCASE < ?")
+            params += [prefix, prefix + _MAX_CHAR]
+        if role is not None:
+            where.append("+is_admin = ?" if sort == "created" else "is_admin = ?")
+            params.append(1 if role == "admin" else 0)
+        return where, params
+
     def get(self, user_id: int) -> User | None:
-        row = self.db.fetchone("SELECT * FROM users WHERE id = ?", (user_id,))
+        return self._cache.get(("user", user_id), lambda: self._load(user_id))
+
+    def _load(self, user_id: int) -> User | None:
+        row = self.db.fetchone("SELECT * FROM users WHERE id = ? AND deleted_at IS NULL", (user_id,))
         return User.from_row(row) if row else None
 
+    def _invalidate(self, user_id: int = None):
+        self._cache.invalidate("all")
+        self._cache.invalidate("search")
+        self._cache.invalidate("count")
+        if user_id is not None:
+            self._cache.invalidate("user", user_id)
+
     def create(self, username: str, password: str, is_admin: bool = False) -> User:
         username = username.strip()
         password = password.strip()
@@ -46,27 +261,133 @@ class UserController:
             raise ValueError("Password cannot be empty.")
         if self.db.fetchone("SELECT id FROM users WHERE username = ?", (username,)):
             raise ValueError(f"User '{username}' already exists.")
-        hashed = _hash_password(password)
+        hashed = passwords.hash_password(password, self.iterations)
         cursor = self.db.execute(
             "INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)",
             (username, hashed, 1 if is_admin else 0),
         )
+        self._invalidate()
         return self.get(cursor.lastrowid)
 
+    # ── bulk provisioning ─────────────────────────────────────────────────────
+
+    def provision_csv(self, path, progress=None, workers: int = None) -> ProvisionResult:
+        """
+        Create every user listed in a CSV file with username, password and
+        (optional) role columns; role is "admin" or "user". See provision().
+        """
+        result = ProvisionResult()
+        entries = []
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                record = {k.strip().lower(): (v or "").strip() for k, v in record.items() if k}
+                role = record.get("role", record.get("is_admin", "")).lower()
+                if role not in _ADMIN_ROLES | _USER_ROLES:
+                    self._skip(result, f"line {reader.line_num}: unknown role '{role}'")
+                    continue
+                entries.append((f"line {reader.line_num}", record.get("username", ""),
+                                record.get("password", ""), role in _ADMIN_ROLES))
+        return self.provision(entries, progress=progress, workers=workers, result=result)
+
+    def provision(self, entries, progress=None, workers: int = None,
+                  result: ProvisionResult = None) -> ProvisionResult:
+        """
+        Create many users at once from (label, username, password, is_admin)
+        entries; label names the entry in error messages. Names already taken
+        (checked with one query) or repeated within the batch are skipped and
+        reported. Passwords are hashed across a process pool, then every user is
+        inserted in a single transaction. progress(hashed, total) is called as
+        hashing goes.
+        """
+        result = result or ProvisionResult()
+        valid, seen = [], set()
+        for label, username, password, is_admin in entries:
+            username, password = username.strip(), password.strip()
+            if not username:
+                self._skip(result, f"{label}: username is required")
+            elif not password:
+                self._skip(result, f"{label}: password is required")
+            elif username in seen:
+                self._skip(result, f"{label}: '{username}' appears more than once")
+            else:
+                seen.add(username)
+                valid.append((label, username, password, is_admin))
+
+        taken = self._existing_usernames(seen)
+        for label, username, _, _ in valid:
+            if username in taken:
+                self._skip(result, f"{label}: user '{username}' already exists")
+        valid = [v for v in valid if v[1] not in taken]
+        if not valid:
+            return result
+
+        iterations = self.iterations
+        hashed = []
+        with _hash_pool(len(valid), workers) as pool:
+            for h in pool.map(passwords.hash_password, [v[2] for v in valid], repeat(iterations)):
+                hashed.append(h)
+                if progress:
+                    progress(len(hashed), len(valid))
+
+        names = [v[1] for v in valid]
+        with self.db.transaction():
+            # Re-check under the write lock: names may have been taken while hashing.
+            taken = self._existing_usernames(names)
+            rows = [(v[1], h, 1 if v[3] else 0) for v, h in zip(valid, hashed) if v[1] not in taken]
+            for label, username, _, _ in valid:
+                if username in taken:
+                    self._skip(result, f"{label}: user '{username}' already exists")
+            self.db.executemany("INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)", rows)
+        self._invalidate()
+        result.created = [
+            User.from_row(r) for r in self.db.fetchall(
+                "SELECT * FROM users WHERE username IN (SELECT value FROM json_each(?))"
+                " AND deleted_at IS NULL ORDER BY username",
+                (json.dumps([r[0] for r in rows]),),
+            )
+        ]
+        return result
+
+    def _existing_usernames(self, usernames) -> set[str]:
+        rows = self.db.fetchall(
+            "SELECT username FROM users WHERE username IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(usernames)),),
+        )
+        return {r["username"] for r in rows}
+
+    @staticmethod
+    def _skip(result: ProvisionResult, error: str):
+        result.skipped += 1
+        if len(result.errors) < MAX_ERRORS:
+            result.errors.append(error)
+
     def authenticate(self, user_id: int, password: str) -> bool:
-        row = self.db.fetchone("SELECT password FROM users WHERE id = ?", (user_id,))
+        row = self.db.fetchone(
+            "SELECT username, password FROM users WHERE id = ? AND deleted_at IS NULL", (user_id,)
+        )
         if not row:
             return False
         stored = row["password"]
-        if _verify_password(stored, password):
-            # Auto-migrate legacy plaintext passwords to hashed on successful login
-            if not stored.startswith("pbkdf2$sha256$"):
-                self.db.execute(
-                    "UPDATE users SET password = ? WHERE id = ?",
-                    (_hash_password(password), user_id),
-                )
-            return True
-        return False
+        legacy = not passwords.is_hash(stored)
+        if legacy:
+            # Plaintext the startup job has not reached yet: check it and hash
+            # just this row below.
+            if not passwords.verify_legacy(stored, row["username"], password):
+                return False
+        elif not passwords.verify_password(stored, password):
+            return False
+        # Plaintext, old-format and off-cost hashes are upgraded on a successful
+        # login. password IS ? makes this a no-op if the job or a reset got there
+        # first.
+        iterations = self.iterations
+        if legacy or passwords.needs_rehash(stored, iterations):
+            self.db.execute(
+                "UPDATE users SET password = ? WHERE id = ? AND password IS ?",
+                (passwords.hash_password(password, iterations), user_id, stored),
+            )
+            self._invalidate(user_id)
+        return True
 
     def set_password(self, user_id: int, new_password: str):
         new_password = new_password.strip()
@@ -74,14 +395,36 @@ class UserController:
             raise ValueError("Password cannot be empty.")
         self.db.execute(
             "UPDATE users SET password = ? WHERE id = ?",
-            (_hash_password(new_password), user_id),
+            (passwords.hash_password(new_password, self.iterations), user_id),
         )
+        self._invalidate(user_id)
 
     def set_admin(self, user_id: int, is_admin: bool):
         self.db.execute(
             "UPDATE users SET is_admin = ? WHERE id = ?",
             (1 if is_admin else 0, user_id),
         )
+        self._invalidate(user_id)
 
     def delete(self, user_id: int):
-        self.db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        """
+        Hide the user and their vehicles at once; PurgeController removes the
+        rows and their logs in the background. The username is freed right away
+        by suffixing it with a NUL and the id, which no typed name can contain.
+        """
+        with self.db.transaction():
+            self.db.execute(
+                "UPDATE users SET deleted_at = CURRENT_TIMESTAMP, username = username || char(0) || id"
+                " WHERE id = ? AND deleted_at IS NULL",
+                (user_id,),
+            )
+            self.db.execute(
+                "UPDATE vehicles SET deleted_at = CURRENT_TIMESTAMP WHERE user_id = ? AND deleted_at IS NULL",
+                (user_id,),
+            )
+            self.db.execute(
+                "DELETE FROM vehicle_stats WHERE vehicle_id IN (SELECT id FROM vehicles WHERE user_id = ?)",
+                (user_id,),
+            )
+        # Their vehicles are gone too, so VehicleController's cache is stale.
+        invalidate_all(self.db)
@@ -1,18 +1,26 @@
+from controllers.cache import QueryCache
 from models.vehicle import Vehicle
 
 
 class VehicleController:
     def __init__(self, db):
         self.db = db
+        self._cache = QueryCache(db)
 
     def get_all_for_user(self, user_id: int) -> list[Vehicle]:
+        return list(self._cache.get(("for_user", user_id), lambda: self._load_for_user(user_id)))
+
+    def _load_for_user(self, user_id: int) -> list[Vehicle]:
         rows = self.db.fetchall(
-            "SELECT * FROM vehicles WHERE user_id = ? ORDER BY name", (user_id,)
+            "SELECT * FROM vehicles WHERE user_id = ? AND deleted_at IS NULL ORDER BY name", (user_id,)
         )
         return [Vehicle.from_row(r) for r in rows]
 
     def get(self, vehicle_id: int) -> Vehicle | None:
-        row = self.db.fetchone("SELECT * FROM vehicles WHERE id = ?", (vehicle_id,))
+        return self._cache.get(("vehicle", vehicle_id), lambda: self._load(vehicle_id))
+
+    def _load(self, vehicle_id: int) -> Vehicle | None:
+        row = self.db.fetchone("SELECT * FROM vehicles WHERE id = ? AND deleted_at IS NULL", (vehicle_id,))
         return Vehicle.from_row(row) if row else None
 
     def create(self, user_id: int, name: str, make="", model="", year=None, license_plate="") -> Vehicle:
@@ -23,6 +31,7 @@ class VehicleController:
             "INSERT INTO vehicles (user_id, name, make, model, year, license_plate) VALUES (?,?,?,?,?,?)",
             (user_id, name, make, model, year, license_plate),
         )
+        self._cache.invalidate("for_user", user_id)
         return self.get(cursor.lastrowid)
 
     def update(self, vehicle_id: int, name: str, make="", model="", year=None, license_plate="") -> Vehicle:
@@ -33,7 +42,25 @@ class VehicleController:
             "UPDATE vehicles SET name=?, make=?, model=?, year=?, license_plate=? WHERE id=?",
             (name, make, model, year, license_plate, vehicle_id),
         )
-        return self.get(vehicle_id)
+        self._cache.invalidate("vehicle", vehicle_id)
+        vehicle = self.get(vehicle_id)
+        if vehicle:
+            self._cache.invalidate("for_user", vehicle.user_id)
+        return vehicle
 
     def delete(self, vehicle_id: int):
-        self.db.execute("DELETE FROM vehicles WHERE id = ?", (vehicle_id,))
+        """
+        Hide the vehicle at once; PurgeController removes it and its logs in
+        the background. Dropping the stats row first keeps the per-log stats
+        triggers trivial while the logs are purged.
+        """
+        vehicle = self.get(vehicle_id)
+        with self.db.transaction():
+            self.db.execute(
+                "UPDATE vehicles SET deleted_at = CURRENT_TIMESTAMP WHERE id = ? AND deleted_at IS NULL",
+                (vehicle_id,),
+            )
+            self.db.execute("DELETE FROM vehicle_stats WHERE vehicle_id = ?", (vehicle_id,))
+        self._cache.invalidate("vehicle", vehicle_id)
+        if vehicle:
+            self._cache.invalidate("for_user", vehicle.user_id)
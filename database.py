@@ -2,35 +2,265 @@
 Database layer — wraps SQLite with a simple interface.
 All SQL lives here; the rest of the app never touches it directly.
 """
+import logging
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from models.mileage_log import parse_log_date
+from query_stats import QueryStats
+
+log = logging.getLogger(__name__)
+
+# ── indexes ───────────────────────────────────────────────────────────────────
+# The index set is declarative: anything named idx_* that is not listed here is
+# dropped when the indexes are synced, so changing an index means renaming it.
+INDEXES = {
+    # get_logs / latest_odometer / log_count: seek on vehicle, walk (date, id)
+    # in order; odometer_reading rides along so latest_odometer is index-only.
+    "idx_mileage_logs_vehicle_date":
+        "CREATE INDEX IF NOT EXISTS idx_mileage_logs_vehicle_date "
+        "ON mileage_logs (vehicle_id, date, id, odometer_reading)",
+    # MIN/MAX per vehicle answered from either end of the range (vehicle_stats
+    # triggers and rebuilds).
+    "idx_mileage_logs_vehicle_odometer":
+        "CREATE INDEX IF NOT EXISTS idx_mileage_logs_vehicle_odometer "
+        "ON mileage_logs (vehicle_id, odometer_reading)",
+    # Date-range reads and per-period aggregates: a range scan on the integer
+    # day number that never touches the table.
+    "idx_mileage_logs_vehicle_day":
+        "CREATE INDEX IF NOT EXISTS idx_mileage_logs_vehicle_day "
+        "ON mileage_logs (vehicle_id, day, odometer_reading)",
+    # get_all_for_user: seek on user, already sorted by name. Also serves the
+    # users -> vehicles foreign key when a purged user row is deleted.
+    "idx_vehicles_user_name":
+        "CREATE INDEX IF NOT EXISTS idx_vehicles_user_name "
+        "ON vehicles (user_id, name)",
+    # PurgeController: find rows marked for deletion without scanning.
+    "idx_vehicles_pending":
+        "CREATE INDEX IF NOT EXISTS idx_vehicles_pending "
+        "ON vehicles (deleted_at) WHERE deleted_at IS NOT NULL",
+    "idx_users_pending":
+        "CREATE INDEX IF NOT EXISTS idx_users_pending "
+        "ON users (deleted_at) WHERE deleted_at IS NOT NULL",
+    # UserController.search: case-insensitive prefix range over live users. The
+    # UNIQUE constraint's index compares with BINARY, so it cannot serve NOCASE.
+    "idx_users_username_nocase":
+        "CREATE INDEX IF NOT EXISTS idx_users_username_nocase "
+        "ON users (username COLLATE NOCASE) WHERE deleted_at IS NULL",
+    # Admin user table sorted by role or by creation date (see USER_SORTS);
+    # the name sort uses idx_users_username_nocase.
+    "idx_users_role_name":
+        "CREATE INDEX IF NOT EXISTS idx_users_role_name "
+        "ON users (is_admin, username COLLATE NOCASE) WHERE deleted_at IS NULL",
+    "idx_users_created":
+        "CREATE INDEX IF NOT EXISTS idx_users_created "
+        "ON users (created_at) WHERE deleted_at IS NULL",
+}
+
+
+# ── triggers ──────────────────────────────────────────────────────────────────
+# The vehicle_stats update trigger is dropped around bulk date rewrites (see
+# _migration_log_day), which then rebuild the stats once.
+_STATS_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_stats_update
+    AFTER UPDATE OF vehicle_id, odometer_reading, date ON mileage_logs
+    BEGIN
+        UPDATE vehicle_stats SET log_count = log_count - 1
+        WHERE vehicle_id = OLD.vehicle_id AND OLD.vehicle_id <> NEW.vehicle_id;
+
+        INSERT INTO vehicle_stats (vehicle_id, log_count) VALUES (NEW.vehicle_id, 1)
+        ON CONFLICT (vehicle_id) DO UPDATE SET log_count = log_count + 1
+        WHERE OLD.vehicle_id <> NEW.vehicle_id;
+
+        UPDATE vehicle_stats SET
+            min_odometer = (SELECT MIN(odometer_reading) FROM mileage_logs m
+                            WHERE m.vehicle_id = vehicle_stats.vehicle_id),
+            max_odometer = (SELECT MAX(odometer_reading) FROM mileage_logs m
+                            WHERE m.vehicle_id = vehicle_stats.vehicle_id),
+            (latest_log_id, latest_date, latest_odometer) = (
+                SELECT id, date, odometer_reading FROM mileage_logs m
+                WHERE m.vehicle_id = vehicle_stats.vehicle_id
+                ORDER BY date DESC, id DESC LIMIT 1
+            )
+        WHERE vehicle_id IN (OLD.vehicle_id, NEW.vehicle_id);
+
+        DELETE FROM vehicle_stats WHERE vehicle_id = OLD.vehicle_id AND log_count <= 0;
+    END
+"""
+
+
+def _is_unindexed(detail: str) -> bool:
+    """True for query-plan steps that read a whole table or sort in a temp B-tree."""
+    if "TEMP B-TREE" in detail:
+        return True
+    return detail.startswith("SCAN ") and "INDEX" not in detail and "CONSTANT ROW" not in detail
+
 
 class Database:
-    def __init__(self, db_path: str = None):
+    """
+    One writer connection guarded by a re-entrant lock, safe to call from any
+    thread. With wal=True the file runs in WAL mode and reads from threads other
+    than the one that opened the database go to a small pool of read-only
+    connections, so background work never waits on the UI thread's writes.
+    """
+
+    BUSY_TIMEOUT_MS = 5000
+
+    def __init__(self, db_path: str = None, check_plans: bool = False,
+                 wal: bool = False, readers: int = 4, slow_query_ms: float = None):
         if db_path is None:
             db_path = Path(__file__).parent / "torque_tracker.db"
         self.db_path = str(db_path)
+        self.check_plans = False
+        self.query_plans: dict[str, list[str]] = {}
+        self.stats: QueryStats | None = None
+        self.wal = wal and self.db_path != ":memory:"
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        self._tx_owner = None
+        self._owner_thread = threading.get_ident()
+        self._max_readers = max(1, readers)
+        self._reader_pool = queue.LifoQueue()
+        self._reader_count = 0
+        self._pinned = threading.local()
         self._connect()
-        self._create_tables()
+        self._migrate()
+        # False when this SQLite build lacks FTS5; note search then falls back to LIKE.
+        self.has_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mileage_logs_fts'"
+        ).fetchone() is not None
+        if slow_query_ms is not None:
+            self.enable_instrumentation(slow_query_ms)
+        # When enabled, every read is EXPLAINed once and full scans are logged.
+        self.check_plans = check_plans
 
     # ── connection ────────────────────────────────────────────────────────────
 
     def _connect(self):
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # isolation_level=None: no implicit BEGIN. Statements outside
+        # transaction() autocommit; transaction() issues BEGIN/SAVEPOINT itself.
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        if self.wal:
+            mode = self.conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if mode.lower() == "wal":
+                # Durable at checkpoint; safe against corruption in WAL mode.
+                self.conn.execute("PRAGMA synchronous = NORMAL")
+            else:
+                log.warning("WAL not available for %s (journal_mode=%s)", self.db_path, mode)
+                self.wal = False
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """
+        Check out a read-only connection for the current thread. Every
+        fetchall/fetchone made by this thread inside the block uses it and sees
+        one consistent snapshot. Falls back to the writer when WAL is off.
+        """
+        pinned = getattr(self._pinned, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        if not self.wal:
+            with self._lock:
+                yield self.conn
+            return
+
+        try:
+            conn = self._reader_pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._reader_count < self._max_readers
+                if create:
+                    self._reader_count += 1
+            conn = self._open_reader() if create else self._reader_pool.get()
+
+        self._pinned.conn = conn
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            self._pinned.conn = None
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+            self._reader_pool.put(conn)
+
+    @contextmanager
+    def _read_conn(self):
+        pinned = getattr(self._pinned, "conn", None)
+        if pinned is not None:
+            yield pinned
+        elif (self.wal
+              and threading.get_ident() != self._owner_thread
+              and self._tx_owner != threading.get_ident()):
+            with self.reader() as conn:
+                yield conn
+        else:
+            with self._lock:
+                yield self.conn
+
+    # ── migrations ────────────────────────────────────────────────────────────
+    # Ordered schema steps. A database at PRAGMA user_version N has run the first
+    # N steps; each step runs in its own transaction together with the version
+    # bump. Steps must be idempotent because pre-versioning files start at 0.
+    # Each step creates the INDEXES entries for the columns it adds, so later
+    # steps on a large upgraded file never run unindexed. INDEXES is also synced
+    # with the final step, so a change to it needs a new step.
 
-    def _create_tables(self):
-        self.conn.executescript("""
+    MIGRATIONS = (
+        "_migration_create_tables",
+        "_migration_legacy_user_columns",
+        "_migration_indexes",
+        "_migration_vehicle_stats",
+        "_migration_log_day",
+        "_migration_pending_delete",
+        "_migration_notes_fts",
+        "_migration_settings",
+        "_migration_username_search",
+        "_migration_admin_user_sorts",
+    )
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(self.MIGRATIONS):
+            return
+
+        while True:
+            with self.transaction():
+                # Re-read under the write lock: another instance may have migrated.
+                version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+                if version >= len(self.MIGRATIONS):
+                    return
+                getattr(self, self.MIGRATIONS[version])()
+                if version + 1 == len(self.MIGRATIONS):
+                    self._sync_indexes()
+                self.conn.execute(f"PRAGMA user_version = {version + 1}")
+
+    def _migration_create_tables(self):
+        self.conn.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
                 username    TEXT UNIQUE NOT NULL,
                 password    TEXT,
                 is_admin    INTEGER DEFAULT 0,
                 created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
+            )
+        """)
+        self.conn.execute("""
             CREATE TABLE IF NOT EXISTS vehicles (
                 id            INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id       INTEGER NOT NULL,
@@ -41,8 +271,9 @@ class Database:
                 license_plate TEXT    DEFAULT '',
                 created_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-
+            )
+        """)
+        self.conn.execute("""
             CREATE TABLE IF NOT EXISTS mileage_logs (
                 id               INTEGER PRIMARY KEY AUTOINCREMENT,
                 vehicle_id       INTEGER NOT NULL,
@@ -51,46 +282,432 @@ class Database:
                 notes            TEXT    DEFAULT '',
                 created_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (vehicle_id) REFERENCES vehicles(id) ON DELETE CASCADE
-            );
+            )
         """)
-        self._migrate_users_password_column()
-        self._migrate_admin_column()
-        self.conn.commit()
 
-    def _migrate_users_password_column(self):
-        cols = {row["name"] for row in self.fetchall("PRAGMA table_info(users)")}
+    def _migration_legacy_user_columns(self):
+        """
+        Bring databases from before passwords and admins up to date. Users
+        without a password are left NULL; UserController.hash_legacy_passwords
+        gives them a hash of their username.
+        """
+        cols = {row["name"] for row in self.conn.execute("PRAGMA table_info(users)")}
         if "password" not in cols:
-            self.execute("ALTER TABLE users ADD COLUMN password TEXT")
+            self.conn.execute("ALTER TABLE users ADD COLUMN password TEXT")
 
-        self.execute("""
-            UPDATE users
-            SET password = username
-            WHERE password IS NULL OR TRIM(password) = ''
-        """)
-
-    def _migrate_admin_column(self):
-        cols = {row["name"] for row in self.fetchall("PRAGMA table_info(users)")}
         if "is_admin" not in cols:
-            self.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
+            self.conn.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
             # Promote the earliest user to admin for existing databases
-            first_user = self.fetchone("SELECT id FROM users ORDER BY id LIMIT 1")
+            first_user = self.conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()
             if first_user:
-                self.execute("UPDATE users SET is_admin = 1 WHERE id = ?", (first_user["id"],))
+                self.conn.execute("UPDATE users SET is_admin = 1 WHERE id = ?", (first_user["id"],))
+
+    def _migration_indexes(self):
+        """First index set (see INDEXES), on columns the original schema has."""
+        self._create_indexes(
+            "idx_mileage_logs_vehicle_date", "idx_mileage_logs_vehicle_odometer", "idx_vehicles_user_name",
+        )
+
+    def _migration_vehicle_stats(self):
+        """
+        vehicle_stats holds per-vehicle aggregates of mileage_logs, kept exact by
+        triggers. Deletes and updates only re-derive a value when the row that
+        produced it changed, and then with a single index seek.
+        """
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS vehicle_stats (
+                vehicle_id      INTEGER PRIMARY KEY,
+                log_count       INTEGER NOT NULL DEFAULT 0,
+                min_odometer    REAL,
+                max_odometer    REAL,
+                latest_log_id   INTEGER,
+                latest_date     DATE,
+                latest_odometer REAL,
+                FOREIGN KEY (vehicle_id) REFERENCES vehicles(id) ON DELETE CASCADE
+            )
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_stats_insert
+            AFTER INSERT ON mileage_logs
+            BEGIN
+                INSERT INTO vehicle_stats (vehicle_id, log_count, min_odometer, max_odometer,
+                                           latest_log_id, latest_date, latest_odometer)
+                VALUES (NEW.vehicle_id, 1, NEW.odometer_reading, NEW.odometer_reading,
+                        NEW.id, NEW.date, NEW.odometer_reading)
+                ON CONFLICT (vehicle_id) DO UPDATE SET
+                    log_count    = log_count + 1,
+                    min_odometer = MIN(min_odometer, excluded.min_odometer),
+                    max_odometer = MAX(max_odometer, excluded.max_odometer),
+                    latest_log_id = CASE
+                        WHEN (excluded.latest_date, excluded.latest_log_id) > (latest_date, latest_log_id)
+                        THEN excluded.latest_log_id ELSE latest_log_id END,
+                    latest_date = CASE
+                        WHEN (excluded.latest_date, excluded.latest_log_id) > (latest_date, latest_log_id)
+                        THEN excluded.latest_date ELSE latest_date END,
+                    latest_odometer = CASE
+                        WHEN (excluded.latest_date, excluded.latest_log_id) > (latest_date, latest_log_id)
+                        THEN excluded.latest_odometer ELSE latest_odometer END;
+            END
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_stats_delete
+            AFTER DELETE ON mileage_logs
+            BEGIN
+                UPDATE vehicle_stats SET
+                    log_count = log_count - 1,
+                    min_odometer = CASE WHEN OLD.odometer_reading <= min_odometer
+                        THEN (SELECT MIN(odometer_reading) FROM mileage_logs WHERE vehicle_id = OLD.vehicle_id)
+                        ELSE min_odometer END,
+                    max_odometer = CASE WHEN OLD.odometer_reading >= max_odometer
+                        THEN (SELECT MAX(odometer_reading) FROM mileage_logs WHERE vehicle_id = OLD.vehicle_id)
+                        ELSE max_odometer END
+                WHERE vehicle_id = OLD.vehicle_id;
+
+                UPDATE vehicle_stats SET (latest_log_id, latest_date, latest_odometer) = (
+                    SELECT id, date, odometer_reading FROM mileage_logs
+                    WHERE vehicle_id = OLD.vehicle_id ORDER BY date DESC, id DESC LIMIT 1
+                )
+                WHERE vehicle_id = OLD.vehicle_id AND latest_log_id = OLD.id;
+
+                DELETE FROM vehicle_stats WHERE vehicle_id = OLD.vehicle_id AND log_count <= 0;
+            END
+        """)
+        self.conn.execute(_STATS_UPDATE_TRIGGER)
+        # users/vehicles.deleted_at only arrive with _migration_pending_delete.
+        self._rebuild_vehicle_stats(live_only=False)
+
+    def _migration_log_day(self, batch_size: int = 5000):
+        """
+        Add mileage_logs.day (date.toordinal() of the log date) and normalize
+        existing dates to ISO. Rows whose date cannot be parsed keep their text
+        and a NULL day, so they drop out of range queries but stay in history.
+        """
+        cols = {row["name"] for row in self.conn.execute("PRAGMA table_info(mileage_logs)")}
+        if "day" not in cols:
+            self.conn.execute("ALTER TABLE mileage_logs ADD COLUMN day INTEGER")
+        self._create_indexes("idx_mileage_logs_vehicle_day")
+        # Rewriting dates would fire the stats trigger once a row; drop it and
+        # rebuild the stats once at the end instead.
+        self.conn.execute("DROP TRIGGER IF EXISTS trg_mileage_logs_stats_update")
+
+        last_id, bad, normalized = 0, 0, 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT id, date FROM mileage_logs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            day_updates, date_updates = [], []
+            for row in rows:
+                try:
+                    parsed = parse_log_date(row["date"])
+                except ValueError:
+                    bad += 1
+                    continue
+                day_updates.append((parsed.toordinal(), row["id"]))
+                if parsed.isoformat() != row["date"]:
+                    date_updates.append((parsed.isoformat(), row["id"]))
+            self.conn.executemany("UPDATE mileage_logs SET day = ? WHERE id = ?", day_updates)
+            self.conn.executemany("UPDATE mileage_logs SET date = ? WHERE id = ?", date_updates)
+            normalized += len(date_updates)
+        self.conn.execute(_STATS_UPDATE_TRIGGER)
+        if normalized:
+            self._rebuild_vehicle_stats(live_only=False)
+        if bad:
+            log.warning("%d mileage log(s) have unparseable dates and no day number", bad)
+
+    def _migration_pending_delete(self):
+        """
+        users.deleted_at / vehicles.deleted_at mark rows whose delete is still
+        being purged in the background (see PurgeController). NULL means live.
+        """
+        for table in ("users", "vehicles"):
+            cols = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if "deleted_at" not in cols:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN deleted_at TIMESTAMP")
+        self._create_indexes("idx_users_pending", "idx_vehicles_pending")
+
+    def _migration_notes_fts(self):
+        """
+        mileage_logs_fts is an FTS5 index over mileage_logs.notes (external
+        content, so the text is stored once), kept in sync by triggers. Empty
+        notes are never indexed. Skipped when SQLite was built without FTS5.
+        """
+        try:
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS mileage_logs_fts USING fts5(
+                    notes,
+                    content = 'mileage_logs',
+                    content_rowid = 'id',
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            log.warning("FTS5 unavailable (%s); note search will use LIKE", e)
+            return
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_fts_insert
+            AFTER INSERT ON mileage_logs WHEN NEW.notes <> ''
+            BEGIN
+                INSERT INTO mileage_logs_fts (rowid, notes) VALUES (NEW.id, NEW.notes);
+            END
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_fts_delete
+            AFTER DELETE ON mileage_logs WHEN OLD.notes <> ''
+            BEGIN
+                INSERT INTO mileage_logs_fts (mileage_logs_fts, rowid, notes)
+                VALUES ('delete', OLD.id, OLD.notes);
+            END
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_mileage_logs_fts_update
+            AFTER UPDATE OF notes ON mileage_logs
+            BEGIN
+                INSERT INTO mileage_logs_fts (mileage_logs_fts, rowid, notes)
+                SELECT 'delete', OLD.id, OLD.notes WHERE OLD.notes <> '';
+                INSERT INTO mileage_logs_fts (rowid, notes)
+                SELECT NEW.id, NEW.notes WHERE NEW.notes <> '';
+            END
+        """)
+        self.conn.execute("""
+            INSERT INTO mileage_logs_fts (rowid, notes)
+            SELECT id, notes FROM mileage_logs WHERE notes <> ''
+        """)
+
+    def _migration_settings(self):
+        """Small key/value store for values tuned at run time (e.g. the PBKDF2 cost)."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def _migration_username_search(self):
+        self._create_indexes("idx_users_username_nocase")
+
+    def _migration_admin_user_sorts(self):
+        self._create_indexes("idx_users_role_name", "idx_users_created")
+
+    def rebuild_vehicle_stats(self):
+        """Recompute vehicle_stats from mileage_logs (e.g. after editing the file by hand)."""
+        with self.transaction():
+            self._rebuild_vehicle_stats()
+
+    def _rebuild_vehicle_stats(self, live_only: bool = True):
+        live = "WHERE vehicle_id IN (SELECT id FROM vehicles WHERE deleted_at IS NULL)" if live_only else ""
+        self.conn.execute("DELETE FROM vehicle_stats")
+        self.conn.execute(f"""
+            INSERT INTO vehicle_stats (vehicle_id, log_count, min_odometer, max_odometer)
+            SELECT vehicle_id, COUNT(*), MIN(odometer_reading), MAX(odometer_reading)
+            FROM mileage_logs
+            {live}
+            GROUP BY vehicle_id
+        """)
+        self.conn.execute("""
+            UPDATE vehicle_stats SET (latest_log_id, latest_date, latest_odometer) = (
+                SELECT id, date, odometer_reading FROM mileage_logs m
+                WHERE m.vehicle_id = vehicle_stats.vehicle_id
+                ORDER BY date DESC, id DESC LIMIT 1
+            )
+        """)
+
+    def _create_indexes(self, *names):
+        # Names since dropped from INDEXES are skipped; the final sync creates
+        # whatever replaced them.
+        for name in names:
+            if name in INDEXES:
+                self.conn.execute(INDEXES[name])
+
+    def _sync_indexes(self):
+        existing = {
+            row["name"] for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name GLOB 'idx_*'"
+            )
+        }
+        for name in existing - INDEXES.keys():
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for ddl in INDEXES.values():
+            self.conn.execute(ddl)
+
+    # ── query plans ───────────────────────────────────────────────────────────
+
+    def explain(self, query: str, params: tuple = ()) -> list[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+        with self._lock:
+            rows = self.conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [r["detail"] for r in rows]
+
+    def unindexed_steps(self, query: str, params: tuple = ()) -> list[str]:
+        """Plan steps that scan a whole table or need a temp B-tree sort."""
+        return [d for d in self.explain(query, params) if _is_unindexed(d)]
+
+    def _check_plan(self, query: str, params: tuple):
+        if query in self.query_plans:
+            return
+        plan = self.explain(query, params)
+        self.query_plans[query] = plan
+        bad = [d for d in plan if _is_unindexed(d)]
+        if bad:
+            log.warning("Unindexed query plan (%s): %s", "; ".join(bad), " ".join(query.split()))
+
+    # ── instrumentation ───────────────────────────────────────────────────────
+
+    def enable_instrumentation(self, slow_ms: float = 100.0) -> QueryStats:
+        """Start counting statements; anything slower than slow_ms is logged."""
+        if self.stats is None:
+            self.stats = QueryStats(slow_ms)
+        else:
+            self.stats.slow_ms = slow_ms
+        return self.stats
+
+    def disable_instrumentation(self):
+        self.stats = None
+
+    @contextmanager
+    def _timed(self, query: str, params=()):
+        stats = self.stats
+        if stats is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.record(query, time.perf_counter() - start, params)
 
     # ── helpers ───────────────────────────────────────────────────────────────
 
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into a single commit:
+
+            with db.transaction():
+                db.execute(...)
+                db.executemany(...)
+
+        The outermost block runs BEGIN IMMEDIATE ... COMMIT; nested blocks become
+        savepoints, so an inner failure only rolls back the inner block.
+        The writer lock is held for the whole block.
+        """
+        with self._lock:
+            depth = self._tx_depth
+            savepoint = f"sp_{depth}"
+            self.conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+            self._tx_depth += 1
+            self._tx_owner = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self._end_transaction_level()
+                if depth == 0:
+                    self.conn.execute("ROLLBACK")
+                else:
+                    self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    self.conn.execute(f"RELEASE {savepoint}")
+                raise
+            self._end_transaction_level()
+            try:
+                self.conn.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+            except sqlite3.Error:
+                if depth == 0 and self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                raise
+
+    def _end_transaction_level(self):
+        self._tx_depth -= 1
+        if self._tx_depth == 0:
+            self._tx_owner = None
+
+    @property
+    def in_transaction(self) -> bool:
+        """True when the calling thread is inside transaction()."""
+        return self._tx_owner == threading.get_ident()
+
     def execute(self, query: str, params: tuple = ()):
-        """Run an INSERT / UPDATE / DELETE and commit."""
-        cursor = self.conn.execute(query, params)
-        self.conn.commit()
-        return cursor
+        """Run an INSERT / UPDATE / DELETE; commits unless inside transaction()."""
+        with self._lock, self._timed(query, params):
+            return self.conn.execute(query, params)
+
+    def executemany(self, query: str, seq_of_params):
+        """Run one statement for every parameter tuple, all in a single commit."""
+        with self.transaction(), self._timed(query):
+            return self.conn.executemany(query, seq_of_params)
 
     def fetchall(self, query: str, params: tuple = ()):
-        return self.conn.execute(query, params).fetchall()
+        if self.check_plans:
+            self._check_plan(query, params)
+        with self._read_conn() as conn, self._timed(query, params):
+            return conn.execute(query, params).fetchall()
 
     def fetchone(self, query: str, params: tuple = ()):
-        return self.conn.execute(query, params).fetchone()
+        if self.check_plans:
+            self._check_plan(query, params)
+        with self._read_conn() as conn, self._timed(query, params):
+            return conn.execute(query, params).fetchone()
+
+    def iter_rows(self, query: str, params: tuple = (), batch_size: int = 1000):
+        """
+        Stream a SELECT without materializing it. Runs on a read-only snapshot
+        when WAL is on; otherwise it holds the writer lock until exhausted or
+        closed, so prefer calling it from a worker thread with WAL enabled.
+        """
+        if self.check_plans:
+            self._check_plan(query, params)
+        # Only the execute and fetchmany calls are timed, not the consumer's
+        # work between batches; the statement is recorded once when it ends.
+        stats, elapsed = self.stats, 0.0
+
+        def timed(call, *args):
+            nonlocal elapsed
+            start = time.perf_counter()
+            try:
+                return call(*args)
+            finally:
+                elapsed += time.perf_counter() - start
+
+        with self.reader() as conn:
+            try:
+                cursor = timed(conn.execute, query, params)
+                while True:
+                    rows = timed(cursor.fetchmany, batch_size)
+                    if not rows:
+                        return
+                    yield from rows
+            finally:
+                if stats is not None:
+                    stats.record(query, elapsed, params)
+
+    # ── settings ──────────────────────────────────────────────────────────────
+
+    def get_setting(self, key: str, default: str = None) -> str | None:
+        row = self.fetchone("SELECT value FROM settings WHERE key = ?", (key,))
+        return row["value"] if row else default
+
+    def set_setting(self, key: str, value):
+        self.execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the file."""
+        with self._lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        # Readers still checked out by a worker are left to the garbage collector.
+        while True:
+            try:
+                self._reader_pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            if self.conn:
+                self.conn.close()
@@ -2,10 +2,15 @@
 Torque Tracker - Entry Point
 Run this file to start the application.
 """
+import logging
+import os
 import tkinter as tk
 from app import TorqueTrackerApp
 
 if __name__ == "__main__":
+    profiling = bool(os.environ.get("TORQUE_TRACKER_SLOW_MS"))
+    logging.basicConfig(level=logging.INFO if profiling else logging.WARNING,
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
     root = tk.Tk()
     app = TorqueTrackerApp(root)
     root.mainloop()
@@ -0,0 +1,235 @@
+"""
+Torque Tracker - maintenance commands.
+Run `python3 manage.py --help` for the list of commands.
+"""
+import argparse
+import sys
+
+from database import Database, _is_unindexed
+from snapshot import write_snapshot
+from controllers import (
+    UserController, VehicleController, MileageController, ImportController, ExportController,
+    PurgeController,
+)
+
+
+def check_plans(db: Database) -> int:
+    """Run every controller read once and report its query plan."""
+    users = UserController(db)
+    vehicles = VehicleController(db)
+    mileage = MileageController(db)
+
+    user_id = next((u.id for u in users.get_all()), 0)
+    vehicle_id = next((v.id for v in vehicles.get_all_for_user(user_id)), 0)
+    users.get(user_id)
+    users.search("")
+    users.search("a")
+    for sort in ("username", "role", "created"):
+        cursor = users.cursor_at(1, sort)
+        users.get_page(sort, prefix="a", role="admin", after=cursor)
+        users.get_page(sort, descending=True, before=cursor)
+    users.count("a", "user")
+    vehicles.get(vehicle_id)
+    mileage.get(0)
+    mileage.get_logs(vehicle_id)
+    mileage.get_logs(vehicle_id, limit=6)
+    mileage.latest_odometer(vehicle_id)
+    mileage.total_miles(vehicle_id)
+    mileage.log_count(vehicle_id)
+    mileage.dashboard_snapshot(user_id, vehicle_id)
+    mileage.get_logs_page(vehicle_id, after=("9999-12-31", 0))
+    mileage.get_logs_page(vehicle_id, before=("0000-01-01", 0))
+    mileage.cursor_at(vehicle_id, 100)
+    mileage.get_logs_between(vehicle_id, "2000-01-01", "2000-12-31")
+    mileage.period_stats(vehicle_id, "2000-01-01", "2000-12-31")
+
+    failures = 0
+    for query, plan in db.query_plans.items():
+        bad = any(_is_unindexed(d) for d in plan)
+        failures += bad
+        print(("FULL SCAN  " if bad else "ok         ") + " ".join(query.split()))
+        for detail in plan:
+            print(f"             {detail}")
+    return 1 if failures else 0
+
+
+def rebuild_stats(db: Database) -> int:
+    """Recompute the per-vehicle statistics table from the mileage logs."""
+    db.rebuild_vehicle_stats()
+    row = db.fetchone("SELECT COUNT(*) AS vehicles, COALESCE(SUM(log_count), 0) AS logs FROM vehicle_stats")
+    print(f"Rebuilt statistics for {row['vehicles']} vehicles ({row['logs']} logs).")
+    return 0
+
+
+def import_logs(db: Database, args) -> int:
+    """Stream mileage logs from a CSV / JSON Lines / JSON file into the database."""
+    user_id = None
+    if args.user:
+        row = db.fetchone("SELECT id FROM users WHERE username = ? AND deleted_at IS NULL", (args.user,))
+        if not row:
+            print(f"Unknown user '{args.user}'.", file=sys.stderr)
+            return 1
+        user_id = row["id"]
+
+    def progress(imported, skipped, fraction):
+        print(f"\r{fraction:6.1%}  {imported} imported, {skipped} skipped", end="", file=sys.stderr)
+
+    try:
+        result = ImportController(db).import_logs(
+            args.file, user_id=user_id, vehicle_id=args.vehicle_id, fmt=args.format, progress=progress,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    for error in result.errors:
+        print(f"  {error}", file=sys.stderr)
+    print(f"Imported {result.imported} logs, skipped {result.skipped}.")
+    return 0
+
+
+def export(db: Database, args) -> int:
+    """Stream users, vehicles or mileage logs to CSV / JSON Lines."""
+    scope, scope_id = "all", None
+    if args.user:
+        row = db.fetchone("SELECT id FROM users WHERE username = ? AND deleted_at IS NULL", (args.user,))
+        if not row:
+            print(f"Unknown user '{args.user}'.", file=sys.stderr)
+            return 1
+        scope, scope_id = "user", row["id"]
+    if args.vehicle_id is not None:
+        scope, scope_id = "vehicle", args.vehicle_id
+
+    def progress(count, fraction):
+        done = f"{fraction:6.1%}  " if fraction is not None else ""
+        print(f"\r{done}{count} rows", end="", file=sys.stderr)
+
+    exports = ExportController(db)
+    if args.what == "logs":
+        count = exports.export_logs(args.file, scope, scope_id, start=args.start, end=args.end,
+                                    fmt=args.format, progress=progress)
+    elif args.what == "vehicles":
+        count = exports.export_vehicles(args.file, scope if scope != "vehicle" else "all", scope_id,
+                                        fmt=args.format, progress=progress)
+    else:
+        count = exports.export_users(args.file, fmt=args.format, progress=progress)
+    print(file=sys.stderr)
+    print(f"Exported {count} {args.what} to {args.file}.")
+    return 0
+
+
+def snapshot(db: Database, args) -> int:
+    """Write the columnar mileage snapshot used by analytics."""
+    def progress(count, fraction):
+        done = f"{fraction:6.1%}  " if fraction is not None else ""
+        print(f"\r{done}{count} rows", end="", file=sys.stderr)
+
+    result = write_snapshot(db, args.file, progress=progress)
+    print(file=sys.stderr)
+    if result.skipped:
+        print(f"  {result.skipped} logs have unparseable dates and were left out", file=sys.stderr)
+    print(f"Wrote {result.rows} logs to {args.file}.")
+    return 0
+
+
+def purge_deleted(db: Database) -> int:
+    """Finish purging users and vehicles that were deleted in the app."""
+    def progress(logs, fraction):
+        print(f"\r{fraction:6.1%}  {logs} logs", end="", file=sys.stderr)
+
+    result = PurgeController(db).purge(progress=progress)
+    print(file=sys.stderr)
+    print(f"Purged {result.logs} logs, {result.vehicles} vehicles, {result.users} users.")
+    return 0
+
+
+def provision_users(db: Database, args) -> int:
+    """Create users in bulk from a CSV of username, password and role."""
+    def progress(hashed, total):
+        print(f"\r{hashed}/{total} passwords hashed", end="", file=sys.stderr)
+
+    result = UserController(db).provision_csv(args.file, progress=progress, workers=args.workers)
+    print(file=sys.stderr)
+    for error in result.errors:
+        print(f"  {error}", file=sys.stderr)
+    print(f"Created {len(result.created)} users, skipped {result.skipped}.")
+    return 0
+
+
+def calibrate_passwords(db: Database, args) -> int:
+    """Re-measure the PBKDF2 cost used for new password hashes."""
+    users = UserController(db)
+    before = users.iterations
+    iterations = users.calibrate(args.target_ms / 1000)
+    print(f"PBKDF2 iterations: {before} -> {iterations}. Existing hashes are upgraded at next login.")
+    return 0
+
+
+def hash_passwords(db: Database) -> int:
+    """Hash plaintext passwords left from before hashing existed (the app does this at start)."""
+    def progress(done, total):
+        print(f"\r{done}/{total} passwords", end="", file=sys.stderr)
+
+    count = UserController(db).hash_legacy_passwords(progress=progress)
+    print(file=sys.stderr)
+    print(f"Hashed {count} legacy passwords.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", help="path to the database file (default: torque_tracker.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("check-plans", help="verify that controller queries use indexes")
+    sub.add_parser("rebuild-stats", help="recompute per-vehicle statistics from the logs")
+    sub.add_parser("purge-deleted", help="finish purging deleted users and vehicles")
+    p = sub.add_parser("import-logs", help="bulk-import mileage logs from CSV / JSON")
+    p.add_argument("file")
+    p.add_argument("--user", help="resolve vehicle names within this user's vehicles")
+    p.add_argument("--vehicle-id", type=int, help="import every row into this vehicle")
+    p.add_argument("--format", choices=["csv", "jsonl", "json"], help="default: from the file extension")
+    p = sub.add_parser("export", help="stream users, vehicles or logs to CSV / JSON Lines")
+    p.add_argument("what", choices=["logs", "vehicles", "users"])
+    p.add_argument("file")
+    p.add_argument("--user", help="only this user's data")
+    p.add_argument("--vehicle-id", type=int, help="only this vehicle's logs")
+    p.add_argument("--start", help="first log date (YYYY-MM-DD)")
+    p.add_argument("--end", help="last log date (YYYY-MM-DD)")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    p = sub.add_parser("snapshot", help="write a columnar mileage snapshot for analytics")
+    p.add_argument("file")
+    p = sub.add_parser("provision-users", help="create users in bulk from a CSV")
+    p.add_argument("file")
+    p.add_argument("--workers", type=int, help="hashing processes (default: one per CPU)")
+    sub.add_parser("hash-passwords", help="hash plaintext passwords left from older versions")
+    p = sub.add_parser("calibrate-passwords", help="re-measure the password hashing cost")
+    p.add_argument("--target-ms", type=float, default=250, help="time one hash should take (default: 250)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db, check_plans=args.command == "check-plans")
+    try:
+        if args.command == "check-plans":
+            return check_plans(db)
+        if args.command == "rebuild-stats":
+            return rebuild_stats(db)
+        if args.command == "purge-deleted":
+            return purge_deleted(db)
+        if args.command == "import-logs":
+            return import_logs(db, args)
+        if args.command == "export":
+            return export(db, args)
+        if args.command == "snapshot":
+            return snapshot(db, args)
+        if args.command == "provision-users":
+            return provision_users(db, args)
+        if args.command == "hash-passwords":
+            return hash_passwords(db)
+        if args.command == "calibrate-passwords":
+            return calibrate_passwords(db, args)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
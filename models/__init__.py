@@ -1,6 +1,10 @@
 # models package
-from models.user import User
+from models.user import User, UserPage
 from models.vehicle import Vehicle
-from models.mileage_log import MileageLog
+from models.mileage_log import MileageLog, LogPage, PeriodStats, NoteHit
+from models.dashboard import VehicleSummary, DashboardSnapshot
 
-__all__ = ["User", "Vehicle", "MileageLog"]
+__all__ = [
+    "User", "UserPage", "Vehicle", "MileageLog", "LogPage", "PeriodStats", "NoteHit",
+    "VehicleSummary", "DashboardSnapshot",
+]
@@ -0,0 +1,34 @@
+from dataclasses import dataclass, field
+
+from models.mileage_log import MileageLog
+from models.vehicle import Vehicle
+
+
+@dataclass
+class VehicleSummary:
+    vehicle: Vehicle
+    total_miles: float = 0.0
+    log_count: int = 0
+    latest_odometer: float = None
+
+    @classmethod
+    def from_row(cls, row) -> "VehicleSummary":
+        """Build from a vehicles row LEFT JOINed with vehicle_stats."""
+        count = row["log_count"] or 0
+        total = 0.0
+        if count:
+            total = row["max_odometer"] - row["min_odometer"]
+        return cls(
+            vehicle=Vehicle.from_row(row),
+            total_miles=total,
+            log_count=count,
+            latest_odometer=row["latest_odometer"],
+        )
+
+
+@dataclass
+class DashboardSnapshot:
+    """Everything the dashboard renders, read in one pass."""
+    vehicles: list[VehicleSummary] = field(default_factory=list)
+    selected: VehicleSummary = None
+    recent_logs: list[MileageLog] = field(default_factory=list)
@@ -1,4 +1,30 @@
-from dataclasses import dataclass
+import datetime
+from dataclasses import dataclass, field
+
+# Accepted on input; everything is stored as ISO YYYY-MM-DD plus its day number.
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+
+def parse_log_date(value) -> datetime.date:
+    """Parse a log date, raising ValueError for anything that is not a real date."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = str(value or "").strip()
+    if not text:
+        raise ValueError("Date is required.")
+    if len(text) == 10:
+        try:
+            return datetime.date.fromisoformat(text)  # fast path for the common case
+        except ValueError:
+            pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{text}'. Use YYYY-MM-DD.")
 
 
 @dataclass
@@ -20,3 +46,52 @@ class MileageLog:
             notes=row["notes"] or "",
             created_at=row["created_at"],
         )
+
+    @property
+    def cursor(self) -> tuple[str, int]:
+        """Position in the history order, usable as a get_logs_page cursor."""
+        return (self.date, self.id)
+
+
+@dataclass
+class LogPage:
+    """One page of history, newest first."""
+    logs: list[MileageLog] = field(default_factory=list)
+    next_cursor: tuple[str, int] = None   # pass as after= for older entries
+    prev_cursor: tuple[str, int] = None   # pass as before= for newer entries
+    total: int = 0
+
+    @property
+    def rows(self) -> list[MileageLog]:
+        return self.logs
+
+
+@dataclass
+class PeriodStats:
+    """Mileage aggregated over one day / week / month / year."""
+    start: datetime.date
+    entries: int
+    min_odometer: float
+    max_odometer: float
+
+    @property
+    def miles(self) -> float:
+        return self.max_odometer - self.min_odometer
+
+
+@dataclass
+class NoteHit:
+    """A search_notes match: the log, its vehicle's name and the matching excerpt."""
+    log: MileageLog
+    vehicle_name: str
+    snippet: str
+    rank: float = None   # bm25 score, lower is better; None for the LIKE fallback
+
+    @classmethod
+    def from_row(cls, row) -> "NoteHit":
+        return cls(
+            log=MileageLog.from_row(row),
+            vehicle_name=row["vehicle_name"],
+            snippet=row["snippet"] or "",
+            rank=row["rank"],
+        )
@@ -1,11 +1,11 @@
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(frozen=True)
 class User:
     id: int
     username: str
-    password: str
+    password: str = None    # not selected by list/search queries
     is_admin: bool = False
     created_at: str = None
 
@@ -15,13 +15,28 @@ class User:
             is_admin = bool(row["is_admin"])
         except (IndexError, KeyError):
             is_admin = False
+        try:
+            password = row["password"]
+        except (IndexError, KeyError):
+            password = None
         return cls(
             id=row["id"],
             username=row["username"],
-            password=row["password"],
+            password=password,
             is_admin=is_admin,
             created_at=row["created_at"],
         )
 
     def __str__(self):
         return self.username
+
+
+@dataclass
+class UserPage:
+    """One page of the admin user table, in the requested sort order."""
+    users: list[User] = field(default_factory=list)
+    total: int = 0      # users matching the filter, across all pages
+
+    @property
+    def rows(self) -> list[User]:
+        return self.users
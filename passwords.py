@@ -0,0 +1,95 @@
+"""
+PBKDF2-SHA256 password hashes.
+
+Hashes are stored as pbkdf2$sha256$<iterations>$<salt>$<hex digest>, so every
+hash carries its own cost and the cost can be raised without invalidating
+existing passwords. Hashes from before the iteration count was stored have four
+parts and were made with LEGACY_ITERATIONS.
+
+Plaintext passwords from before hashing was added are converted in bulk by
+UserController.hash_legacy_passwords. A user who logs in before the job reaches
+their row is checked with verify_legacy, and only that row is hashed.
+
+Hashing is deliberately slow (a few hundred milliseconds), so callers on the
+Tk thread should go through UserController.submit() rather than calling these
+directly.
+"""
+import hashlib
+import hmac
+import secrets
+import time
+
+PREFIX = "pbkdf2$sha256$"
+LEGACY_ITERATIONS = 260_000
+MIN_ITERATIONS = 260_000       # calibration never goes below the old fixed cost
+MAX_ITERATIONS = 5_000_000
+TARGET_SECONDS = 0.25
+
+
+def _derive(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), salt.encode("utf-8"), iterations
+    ).hex()
+
+
+def hash_password(password: str, iterations: int = MIN_ITERATIONS) -> str:
+    """Hash a password with a random salt at the given cost."""
+    salt = secrets.token_hex(16)
+    return f"{PREFIX}{iterations}${salt}${_derive(password, salt, iterations)}"
+
+
+def _parse(stored: str):
+    """(iterations, salt, digest) of a stored hash, or None if it is not one."""
+    if not stored or not stored.startswith(PREFIX):
+        return None
+    parts = stored[len(PREFIX):].split("$")
+    if len(parts) == 2:
+        return LEGACY_ITERATIONS, parts[0], parts[1]
+    if len(parts) == 3 and parts[0].isdigit():
+        return int(parts[0]), parts[1], parts[2]
+    return None
+
+
+def is_hash(stored: str) -> bool:
+    return _parse(stored) is not None
+
+
+def iterations_of(stored: str) -> int | None:
+    """The cost a stored hash was made with; None for plaintext or malformed values."""
+    parsed = _parse(stored)
+    return parsed[0] if parsed else None
+
+
+def verify_password(stored: str, provided: str) -> bool:
+    """Verify a password against a stored hash; anything that is not a hash never matches."""
+    parsed = _parse(stored)
+    if not parsed:
+        return False
+    iterations, salt, expected = parsed
+    return hmac.compare_digest(_derive(provided, salt, iterations), expected)
+
+
+def legacy_plaintext(stored: str | None, username: str) -> str:
+    """The password a pre-hashing row stands for; a missing one is the username."""
+    return (stored or "").strip() or username
+
+
+def verify_legacy(stored: str | None, username: str, provided: str) -> bool:
+    """Verify a password against a plaintext row, in constant time."""
+    return hmac.compare_digest(legacy_plaintext(stored, username).encode("utf-8"),
+                               provided.encode("utf-8"))
+
+
+def needs_rehash(stored: str, iterations: int) -> bool:
+    """True if the hash is in the old format or was made at a different cost."""
+    return stored.count("$") != 4 or iterations_of(stored) != iterations
+
+
+def calibrate(target_seconds: float = TARGET_SECONDS) -> int:
+    """Iteration count that takes about target_seconds on this machine."""
+    probe = 50_000
+    start = time.perf_counter()
+    _derive("calibration", "0" * 32, probe)
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    iterations = int(probe * target_seconds / elapsed) // 10_000 * 10_000
+    return max(MIN_ITERATIONS, min(MAX_ITERATIONS, iterations))
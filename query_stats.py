@@ -0,0 +1,104 @@
+"""
+Query instrumentation for the Database layer.
+Counts statements and their latencies, keyed by normalized SQL, and logs
+any statement slower than a configurable threshold.
+"""
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+
+log = logging.getLogger("torque_tracker.sql")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and replace literals so equal statements share a key."""
+    query = _STRING.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _SPACE.sub(" ", query).strip()
+    return _IN_LIST.sub("(?, ...)", query)
+
+
+@dataclass
+class StatementStats:
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def add(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+
+class QueryStats:
+    """Thread-safe per-statement counters plus a slow-query log."""
+
+    def __init__(self, slow_ms: float = 100.0):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats: dict[str, StatementStats] = {}
+        self._keys: dict[str, str] = {}  # raw SQL → normalized, to skip the regexes
+
+    def record(self, query: str, elapsed_s: float, params=()):
+        elapsed_ms = elapsed_s * 1000.0
+        key = self._keys.get(query)
+        if key is None:
+            key = normalize_sql(query)
+            if len(self._keys) < 2048:
+                self._keys[query] = key
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = StatementStats(key)
+            entry.add(elapsed_ms)
+        if self.slow_ms is not None and elapsed_ms >= self.slow_ms:
+            # Parameter values are never logged: they include password hashes.
+            log.warning("Slow query (%.1f ms): %s  [%d params]", elapsed_ms, key, len(params or ()))
+
+    def snapshot(self, reset: bool = False) -> list[StatementStats]:
+        """Copy of the counters, most expensive statements first."""
+        with self._lock:
+            entries = [
+                StatementStats(s.sql, s.count, s.total_ms, s.max_ms, list(s.buckets))
+                for s in self._stats.values()
+            ]
+            if reset:
+                self._stats.clear()
+        return sorted(entries, key=lambda s: s.total_ms, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def totals(self) -> tuple[int, float]:
+        """(statement count, total ms) since the last reset."""
+        with self._lock:
+            return (sum(s.count for s in self._stats.values()),
+                    sum(s.total_ms for s in self._stats.values()))
+
+
+def format_report(entries: list[StatementStats], limit: int = 10) -> str:
+    lines = [f"{'count':>6} {'total ms':>9} {'avg ms':>7} {'max ms':>7}  statement"]
+    for s in entries[:limit]:
+        lines.append(f"{s.count:>6} {s.total_ms:>9.2f} {s.avg_ms:>7.2f} {s.max_ms:>7.2f}  {s.sql}")
+    return "\n".join(lines)
@@ -0,0 +1,219 @@
+"""
+Columnar snapshot of mileage_logs for analytics.
+
+Every log is stored as fixed-width columns (vehicle id, day number, odometer)
+sorted by vehicle and day, with a per-vehicle index and the notes in a separate
+heap. SnapshotReader memory-maps the file and hands out views of one vehicle's
+series without touching SQLite or building MileageLog objects.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+# File layout, little-endian, each section padded to 8 bytes: the header
+# (MAGIC, then version, rows, vehicles, heap size, created_at), the index of
+# (vehicle_id, start row, row count), then the vehicle_id, day (toordinal) and
+# odometer columns, the note offsets (rows + 1) and the UTF-8 note heap.
+MAGIC = b"TTSNAP\0\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8s5Q")
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+@dataclass(frozen=True)
+class VehicleSeries:
+    """One vehicle's logs as views into the snapshot, ordered by day."""
+    vehicle_id: int
+    start: int
+    days: memoryview
+    odometer: memoryview
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def release(self):
+        """Drop the views so the snapshot file can be closed."""
+        self.days.release()
+        self.odometer.release()
+
+
+@dataclass
+class SnapshotResult:
+    rows: int
+    skipped: int    # logs with no day number (unparseable dates), left out
+
+
+def write_snapshot(db, dest, progress=None, batch_size: int = 5000) -> SnapshotResult:
+    """
+    Write every live mileage log to `dest`, streamed in vehicle/day index order.
+    The file replaces `dest` only once it is complete. Logs with no day number
+    (unparseable dates) are skipped and counted.
+    """
+    total = db.fetchone("SELECT COALESCE(SUM(log_count), 0) AS n FROM vehicle_stats")["n"]
+    vehicle_ids, days, odometers = array("q"), array("q"), array("d")
+    note_offs, heap = array("Q", [0]), bytearray()
+    index = array("q")
+
+    rows = db.iter_rows(
+        "SELECT vehicle_id, day, odometer_reading, notes FROM mileage_logs "
+        "WHERE vehicle_id NOT IN (SELECT id FROM vehicles WHERE deleted_at IS NOT NULL) "
+        "ORDER BY vehicle_id, day, odometer_reading",
+        batch_size=batch_size,
+    )
+    current, skipped = None, 0
+    for row in rows:
+        if row["day"] is None:
+            skipped += 1
+            continue
+        vid = row["vehicle_id"]
+        if vid != current:
+            if current is not None:
+                index[-1] = len(vehicle_ids) - index[-2]
+            index.extend((vid, len(vehicle_ids), 0))
+            current = vid
+        vehicle_ids.append(vid)
+        days.append(row["day"])
+        odometers.append(row["odometer_reading"])
+        if row["notes"]:
+            heap += row["notes"].encode("utf-8")
+        note_offs.append(len(heap))
+        if progress and len(vehicle_ids) % batch_size == 0:
+            progress(len(vehicle_ids), min(1.0, len(vehicle_ids) / total) if total else None)
+    if current is not None:
+        index[-1] = len(vehicle_ids) - index[-2]
+
+    if sys.byteorder == "big":
+        for column in (index, vehicle_ids, days, odometers, note_offs):
+            column.byteswap()
+
+    dest = Path(dest)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent or ".", prefix=f".{dest.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(vehicle_ids), len(index) // 3,
+                                   len(heap), int(time.time())))
+            for column in (index, vehicle_ids, days, odometers, note_offs):
+                column.tofile(out)
+            out.write(heap)
+            out.write(b"\0" * _pad(len(heap)))
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    if progress:
+        progress(len(vehicle_ids), 1.0)
+    return SnapshotResult(len(vehicle_ids), skipped)
+
+
+class SnapshotReader:
+    """
+    Read-only, memory-mapped view of a snapshot file. Views handed out by
+    series() must be released (or garbage-collected) before close().
+    """
+
+    def __init__(self, path):
+        if sys.byteorder == "big":
+            raise ValueError("snapshot files are little-endian; this platform is not supported")
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open_views()
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def _open_views(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        magic, version, rows, vehicles, heap_size, created = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported snapshot version {version}")
+        expected = _HEADER.size + 8 * (3 * vehicles + 4 * rows + 1) + heap_size + _pad(heap_size)
+        if len(self._mmap) != expected:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+
+        self.row_count = rows
+        self.created_at = created
+        raw = memoryview(self._mmap)
+        self._views = [raw]
+        offset = _HEADER.size
+
+        def column(typecode, count, width=8):
+            nonlocal offset
+            view = raw[offset:offset + count * width].cast(typecode)
+            self._views.append(view)
+            offset += count * width
+            return view
+
+        self._index = column("q", 3 * vehicles)
+        self.vehicle_id = column("q", rows)
+        self.day = column("q", rows)
+        self.odometer = column("d", rows)
+        self._note_offs = column("Q", rows + 1)
+        self._heap = column("B", heap_size, width=1)
+        # The index is small (one entry a vehicle); keep its ids for bisect.
+        self._ids = self._index[0::3].tolist() if vehicles else []
+
+    # ── lookups ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def vehicle_ids(self) -> list[int]:
+        return list(self._ids)
+
+    def _bounds(self, vehicle_id: int):
+        i = bisect_left(self._ids, vehicle_id)
+        if i == len(self._ids) or self._ids[i] != vehicle_id:
+            return None
+        return self._index[3 * i + 1], self._index[3 * i + 2]
+
+    def series(self, vehicle_id: int) -> VehicleSeries:
+        """Zero-copy day/odometer views for one vehicle (empty if it has no logs)."""
+        start, count = self._bounds(vehicle_id) or (0, 0)
+        return VehicleSeries(vehicle_id, start,
+                             self.day[start:start + count],
+                             self.odometer[start:start + count])
+
+    def __iter__(self):
+        """Yield every vehicle's series in vehicle_id order."""
+        for vehicle_id in self._ids:
+            yield self.series(vehicle_id)
+
+    def note(self, row: int) -> str:
+        """Notes text for a row (row numbers are global; use series.start + i)."""
+        if not 0 <= row < self.row_count:
+            raise IndexError(row)
+        lo, hi = self._note_offs[row], self._note_offs[row + 1]
+        return str(self._heap[lo:hi], "utf-8")
+
+    def date(self, row: int) -> date:
+        return date.fromordinal(self.day[row])
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
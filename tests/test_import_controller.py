@@ -0,0 +1,72 @@
+import csv
+
+import pytest
+
+from controllers import ImportController
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tmp_path / "import.db")
+    db.execute("INSERT INTO users (username) VALUES ('alice')")
+    db.execute("INSERT INTO vehicles (user_id, name) VALUES (1, 'Car'), (1, 'Van')")
+    yield db
+    db.close()
+
+
+def _logs(db):
+    return [tuple(r) for r in db.fetchall(
+        "SELECT vehicle_id, odometer_reading, date FROM mileage_logs ORDER BY id"
+    )]
+
+
+def test_malformed_jsonl_line_is_skipped(db, tmp_path):
+    path = tmp_path / "logs.jsonl"
+    path.write_text(
+        '{"vehicle": "Car", "odometer": 10, "date": "2024-01-01"}\n'
+        '{"vehicle": "Car", "odometer": 20, "date": \n'
+        '{"vehicle": "Van", "odometer": 30, "date": "2024-01-03"}\n'
+    )
+    result = ImportController(db).import_logs(path, chunk_size=1)
+    assert (result.imported, result.skipped) == (2, 1)
+    assert result.errors[0].startswith("record 2: malformed JSON")
+    assert _logs(db) == [(1, 10.0, "2024-01-01"), (2, 30.0, "2024-01-03")]
+
+
+def test_malformed_json_array_element_ends_the_import(db, tmp_path):
+    path = tmp_path / "logs.json"
+    path.write_text('[{"vehicle": "Car", "odometer": 10, "date": "2024-01-01"}, {"vehicle": ]')
+    result = ImportController(db).import_logs(path)
+    assert (result.imported, result.skipped) == (1, 1)
+    assert result.errors[0].startswith("record 2: malformed JSON")
+
+
+def test_malformed_csv_line_is_skipped(db, tmp_path):
+    path = tmp_path / "logs.csv"
+    oversized = "x" * (csv.field_size_limit() + 1)
+    path.write_text(f"vehicle,odometer,date\nCar,10,2024-01-01\nCar,10,2024-01-02,{oversized}\nVan,30,2024-01-03\n")
+    result = ImportController(db).import_logs(path, chunk_size=1)
+    assert (result.imported, result.skipped) == (2, 1)
+    assert result.errors[0].startswith("record 3: malformed CSV")
+
+
+@pytest.mark.parametrize("odometer", ["nan", "inf", "-inf"])
+def test_non_finite_odometer_is_skipped(db, tmp_path, odometer):
+    path = tmp_path / "logs.csv"
+    path.write_text(f"vehicle,odometer,date\nCar,{odometer},2024-01-01\nCar,10,2024-01-02\n")
+    result = ImportController(db).import_logs(path)
+    assert (result.imported, result.skipped) == (1, 1)
+    assert "is not a number" in result.errors[0]
+
+
+def test_explicit_vehicle_id_must_be_live(db, tmp_path):
+    path = tmp_path / "logs.csv"
+    path.write_text("odometer,date\n10,2024-01-01\n")
+    db.execute("UPDATE vehicles SET deleted_at = CURRENT_TIMESTAMP WHERE id = 2")
+    imports = ImportController(db)
+    for vehicle_id in (2, 99):
+        with pytest.raises(ValueError):
+            imports.import_logs(path, vehicle_id=vehicle_id)
+    assert _logs(db) == []
+    assert imports.import_logs(path, vehicle_id=1).imported == 1
@@ -0,0 +1,105 @@
+import sqlite3
+
+from database import INDEXES, Database
+
+# Cumulative indexes each migration step must have created, by user_version.
+EXPECTED_INDEXES = {
+    1: set(),
+    2: set(),
+    3: {"idx_mileage_logs_vehicle_date", "idx_mileage_logs_vehicle_odometer", "idx_vehicles_user_name"},
+    5: {"idx_mileage_logs_vehicle_day"},
+    6: {"idx_users_pending", "idx_vehicles_pending"},
+    9: {"idx_users_username_nocase"},
+    10: {"idx_users_role_name", "idx_users_created"},
+}
+
+
+def _seed_legacy(path):
+    """A pre-versioning file: original tables, no indexes, some non-ISO dates."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            make TEXT DEFAULT '', model TEXT DEFAULT '', year INTEGER,
+            license_plate TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE mileage_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vehicle_id INTEGER NOT NULL,
+            odometer_reading REAL NOT NULL,
+            date DATE NOT NULL,
+            notes TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO users (username) VALUES ('alice');
+        INSERT INTO vehicles (user_id, name) VALUES (1, 'Car'), (1, 'Van');
+    """)
+    conn.executemany(
+        "INSERT INTO mileage_logs (vehicle_id, odometer_reading, date, notes) VALUES (?, ?, ?, ?)",
+        [(1 + i % 2, 1000.0 + i, f"2023/01/{1 + i % 28:02d}" if i % 3 else f"2023-02-{1 + i % 28:02d}",
+          "oil" if i % 5 == 0 else "") for i in range(60)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _migrate_to(path, version):
+    """Open the file with only the first `version` steps and no final index sync."""
+    partial = type("PartialDatabase", (Database,), {
+        "MIGRATIONS": Database.MIGRATIONS[:version],
+        "_sync_indexes": lambda self: None,
+    })
+    return partial(path)
+
+
+def _indexes(db):
+    return {r["name"] for r in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_each_step_creates_its_indexes(tmp_path):
+    path = tmp_path / "legacy.db"
+    _seed_legacy(path)
+    expected = set()
+    for version in range(1, len(Database.MIGRATIONS) + 1):
+        expected |= EXPECTED_INDEXES.get(version, set())
+        db = _migrate_to(path, version)
+        try:
+            assert db.fetchone("PRAGMA user_version")[0] == version
+            assert expected <= _indexes(db), f"missing after step {version}"
+        finally:
+            db.close()
+    assert expected == INDEXES.keys()
+
+
+def test_log_day_normalizes_dates_and_keeps_stats_exact(tmp_path):
+    path = tmp_path / "legacy.db"
+    _seed_legacy(path)
+    db = Database(path)
+    try:
+        assert db.fetchone("SELECT COUNT(*) FROM mileage_logs WHERE date LIKE '%/%'")[0] == 0
+        assert db.fetchone("SELECT COUNT(*) FROM mileage_logs WHERE day IS NULL")[0] == 0
+        migrated = [tuple(r) for r in db.fetchall("SELECT * FROM vehicle_stats ORDER BY vehicle_id")]
+        db.rebuild_vehicle_stats()
+        assert migrated == [tuple(r) for r in db.fetchall("SELECT * FROM vehicle_stats ORDER BY vehicle_id")]
+        assert db.fetchone(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_mileage_logs_stats_update'"
+        )
+    finally:
+        db.close()
+
+
+def test_fresh_database_has_every_index(tmp_path):
+    Database(tmp_path / "fresh.db").close()
+    db = Database(tmp_path / "fresh.db")
+    try:
+        assert INDEXES.keys() <= _indexes(db)
+    finally:
+        db.close()
@@ -1,23 +1,43 @@
 """
 AdminView — admin-only user management panel.
-Allows admins to create, delete, promote/demote users, and reset passwords.
+Allows admins to create (singly or from a CSV), delete, promote/demote users,
+and reset passwords.
+
+The user table is paged from UserController.get_page: only the visible rows
+are read, clicking a heading sorts by that column, and the name / role filter
+narrows it in SQL. Edits redraw the affected row instead of reloading.
 """
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from app import COLORS
+from views.background import run_in_background, wait_for
+from views.virtual_tree import VirtualTreeview
 from views.widgets import RoundedButton, RoundedPanel
 
+HEADINGS = {"username": "Username", "role": "Role", "created": "Created"}
+ROLE_FILTERS = {"All roles": None, "Admins": "admin", "Users": "user"}
+
 
 class AdminView(tk.Frame):
+    SEARCH_DELAY_MS = 200
+
     def __init__(self, parent, app, main_view):
         super().__init__(parent, bg=COLORS["bg"])
         self.app = app
         self.main_view = main_view
-        self._users = []
+        self._sort = "username"
+        self._descending = False
+        self._search_job = None
+        self._creating = False   # a create is hashing on the worker
         self.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
         self._build()
         self._load_users()
 
+    def destroy(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        super().destroy()
+
     # ── layout ────────────────────────────────────────────────────────────────
 
     def _build(self):
@@ -32,6 +52,7 @@ class AdminView(tk.Frame):
 
         self._build_user_table(left)
         self._build_create_form(right)
+        self._build_bulk_import(right)
 
     def _build_user_table(self, parent):
         table_panel = RoundedPanel(
@@ -45,31 +66,43 @@ class AdminView(tk.Frame):
         table_panel.pack(fill=tk.BOTH, expand=True)
         body = table_panel.content
 
-        tk.Label(body, text="User Management", font=("Segoe UI", 14, "bold"),
-                 bg=COLORS["card"], fg=COLORS["text"]).pack(anchor="w", pady=(0, 12))
+        hdr = tk.Frame(body, bg=COLORS["card"])
+        hdr.pack(fill=tk.X, pady=(0, 12))
+        tk.Label(hdr, text="User Management", font=("Segoe UI", 14, "bold"),
+                 bg=COLORS["card"], fg=COLORS["text"]).pack(side=tk.LEFT)
+        self._count_label = tk.Label(hdr, text="", font=("Segoe UI", 9),
+                                     bg=COLORS["card"], fg=COLORS["muted"])
+        self._count_label.pack(side=tk.LEFT, padx=(10, 0))
 
-        # Treeview
-        tree_frame = tk.Frame(body, bg=COLORS["card"])
-        tree_frame.pack(fill=tk.BOTH, expand=True)
+        # Filters, applied in SQL (name prefix debounced while typing)
+        self._role_var = tk.StringVar(value="All roles")
+        role_combo = ttk.Combobox(hdr, textvariable=self._role_var, values=list(ROLE_FILTERS),
+                                  state="readonly", width=10)
+        role_combo.pack(side=tk.RIGHT)
+        role_combo.bind("<<ComboboxSelected>>", lambda _: self._load_users())
 
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self._filter_var = tk.StringVar()
+        tk.Entry(hdr, textvariable=self._filter_var,
+                 bg=COLORS["input"], fg=COLORS["text"],
+                 insertbackground=COLORS["text"],
+                 font=("Segoe UI", 10), relief=tk.FLAT, width=18,
+                 highlightthickness=1,
+                 highlightbackground=COLORS["border"],
+                 highlightcolor=COLORS["accent"],
+                 bd=0).pack(side=tk.RIGHT, ipady=4, ipadx=6, padx=(0, 8))
+        tk.Label(hdr, text="Filter names", font=("Segoe UI", 9),
+                 bg=COLORS["card"], fg=COLORS["muted"]).pack(side=tk.RIGHT, padx=(0, 6))
+        self._filter_var.trace_add("write", lambda *_: self._schedule_filter())
 
-        self._tree = ttk.Treeview(
-            tree_frame,
-            columns=("username", "role", "created"),
-            show="headings",
-            yscrollcommand=vsb.set,
-        )
-        vsb.config(command=self._tree.yview)
-
-        self._tree.heading("username", text="Username")
-        self._tree.heading("role", text="Role")
-        self._tree.heading("created", text="Created")
+        # Only the visible rows live in Tk; users are paged in by cursor on scroll
+        self._table = VirtualTreeview(body, columns=tuple(HEADINGS))
+        self._tree = self._table.tree
+        for column in HEADINGS:
+            self._tree.heading(column, command=lambda c=column: self._sort_by(c))
         self._tree.column("username", width=200)
         self._tree.column("role", width=110, anchor="center")
         self._tree.column("created", width=150)
-        self._tree.pack(fill=tk.BOTH, expand=True)
+        self._table.pack(fill=tk.BOTH, expand=True)
 
         # Action buttons
         actions = tk.Frame(body, bg=COLORS["card"])
@@ -189,26 +222,111 @@ class AdminView(tk.Frame):
             pad_y=8,
         ).pack(fill=tk.X)
 
+    def _build_bulk_import(self, parent):
+        panel = RoundedPanel(
+            parent,
+            bg=COLORS["card"],
+            border_color=COLORS["border"],
+            radius=14,
+            pad_x=18,
+            pad_y=18,
+        )
+        panel.pack(fill=tk.X, pady=(12, 0))
+        body = panel.content
+
+        tk.Label(body, text="Import Users", font=("Segoe UI", 13, "bold"),
+                 bg=COLORS["card"], fg=COLORS["text"]).pack(anchor="w", pady=(0, 6))
+        tk.Label(body, text="CSV with username, password and role\n(admin or user) columns.",
+                 font=("Segoe UI", 9), justify=tk.LEFT,
+                 bg=COLORS["card"], fg=COLORS["muted"]).pack(anchor="w", pady=(0, 12))
+
+        self._import_btn = RoundedButton(
+            body,
+            text="Import CSV…",
+            command=self._import_users,
+            bg=COLORS["surface_alt"],
+            fg=COLORS["button_text"],
+            hover_bg=COLORS["border"],
+            active_bg=COLORS["border"],
+            font=("Segoe UI", 10, "bold"),
+            radius=10,
+            pad_y=8,
+        )
+        self._import_btn.pack(fill=tk.X)
+
+        self._import_status = tk.Label(body, text="", font=("Segoe UI", 9),
+                                       bg=COLORS["card"], fg=COLORS["muted"])
+        self._import_status.pack(anchor="w", pady=(6, 0))
+
     # ── data ──────────────────────────────────────────────────────────────────
 
     def _load_users(self):
-        for item in self._tree.get_children():
-            self._tree.delete(item)
-        self._users = self.app.users.get_all()
-        me = self.app.current_user.id
-        for u in self._users:
-            role = "Admin" if u.is_admin else "User"
-            label = f"{u.username} (you)" if u.id == me else u.username
-            created = u.created_at.split(" ")[0] if u.created_at else "—"
-            self._tree.insert("", tk.END, iid=str(u.id), values=(label, role, created))
+        """Point the table at the current sort and filter, from the top."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        self._data_version = self.app.db.data_version()
+        users = self.app.users
+        sort, descending = self._sort, self._descending
+        prefix, role = self._filter_var.get(), ROLE_FILTERS[self._role_var.get()]
+        self._table.set_source(
+            lambda after=None, before=None, limit=50: users.get_page(
+                sort, descending, prefix, role, after=after, before=before, limit=limit),
+            lambda offset: users.cursor_at(offset, sort, descending, prefix, role),
+            lambda u: (str(u.id), self._row_values(u), users.sort_cursor(u, sort)),
+        )
+        self._update_headings()
+        self._update_count()
+
+    def _reload(self):
+        """Re-read the visible page in place, e.g. after users were added."""
+        self._data_version = self.app.db.data_version()
+        self._table.reload()
+        self._update_count()
+
+    def _update_count(self):
+        count = self.app.users.count(self._filter_var.get(), ROLE_FILTERS[self._role_var.get()])
+        self._count_label.configure(text=f"{count:,} user{'s' if count != 1 else ''}")
+
+    def _update_headings(self):
+        arrow = " ▼" if self._descending else " ▲"
+        for column, text in HEADINGS.items():
+            self._tree.heading(column, text=text + (arrow if column == self._sort else ""))
+
+    def _sort_by(self, column: str):
+        """Heading click: sort by that column, or flip the order if it already is."""
+        if column == self._sort:
+            self._descending = not self._descending
+        else:
+            self._sort, self._descending = column, False
+        self._load_users()
+
+    def _schedule_filter(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._load_users)
+
+    def _row_values(self, u):
+        role = "Admin" if u.is_admin else "User"
+        label = f"{u.username} (you)" if u.id == self.app.current_user.id else u.username
+        created = u.created_at.split(" ")[0] if u.created_at else "—"
+        return label, role, created
+
+    def refresh(self, reason: str):
+        """Only outside changes matter here; this page applies its own edits."""
+        if reason == "shown" and self._stale():
+            self._reload()
+
+    def _stale(self) -> bool:
+        """True when another app instance changed the database since the last load."""
+        return self.app.db.data_version() != self._data_version
 
     def _selected_user(self):
-        sel = self._tree.selection()
-        if not sel:
+        user_id = self._table.selected_id
+        if user_id is None:
             messagebox.showwarning("No Selection", "Please select a user first.", parent=self)
             return None
-        user_id = int(sel[0])
-        return next((u for u in self._users if u.id == user_id), None)
+        return self.app.users.get(int(user_id))
 
     # ── actions ───────────────────────────────────────────────────────────────
 
@@ -224,15 +342,16 @@ class AdminView(tk.Frame):
         )
         if not new_pw:
             return
-        try:
-            self.app.users.set_password(user.id, new_pw)
-            messagebox.showinfo(
+        wait_for(
+            self,
+            self.app.users.submit(self.app.users.set_password, user.id, new_pw),
+            on_done=lambda _: messagebox.showinfo(
                 "Password Reset",
                 f"Password for {user.username} has been reset.",
                 parent=self,
-            )
-        except ValueError as e:
-            messagebox.showerror("Error", str(e), parent=self)
+            ),
+            on_error=lambda e: messagebox.showerror("Error", str(e), parent=self),
+        )
 
     def _toggle_admin(self):
         user = self._selected_user()
@@ -247,8 +366,7 @@ class AdminView(tk.Frame):
             return
         # Prevent removing the last admin
         if user.is_admin:
-            admin_count = sum(1 for u in self._users if u.is_admin)
-            if admin_count <= 1:
+            if self.app.users.count(role="admin") <= 1:
                 messagebox.showwarning(
                     "Cannot Demote",
                     "There must be at least one admin. Create another admin first.",
@@ -264,7 +382,11 @@ class AdminView(tk.Frame):
         ):
             return
         self.app.users.set_admin(user.id, new_status)
-        self._load_users()
+        if self._stale():
+            self._reload()
+        else:
+            self._table.update_row(self.app.users.get(user.id))
+            self._update_count()
 
     def _delete_user(self):
         user = self._selected_user()
@@ -284,10 +406,53 @@ class AdminView(tk.Frame):
         ):
             return
         self.app.users.delete(user.id)
-        self._load_users()
+        self.app.purge_deleted()
+        if self._stale():
+            self._reload()
+        else:
+            self._table.remove_row(user.id)
+            self._update_count()
         messagebox.showinfo("User Deleted", f"'{user.username}' has been deleted.", parent=self)
 
+    def _import_users(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Import Users",
+            filetypes=[("CSV", "*.csv"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        self._import_btn.set_disabled(True)
+        self._import_status.configure(text="Hashing passwords…")
+
+        def on_progress(hashed, total):
+            self._import_status.configure(text=f"Hashing passwords… {hashed:,} / {total:,}")
+
+        def on_done(result):
+            self._import_btn.set_disabled(False)
+            self._import_status.configure(text="")
+            self._reload()
+            message = f"Created {len(result.created):,} users."
+            if result.skipped:
+                message += f"\nSkipped {result.skipped:,} rows:\n\n" + "\n".join(result.errors[:10])
+            messagebox.showinfo("Import Complete", message, parent=self)
+
+        def on_error(exc):
+            self._import_btn.set_disabled(False)
+            self._import_status.configure(text="")
+            messagebox.showerror("Import Failed", str(exc), parent=self)
+
+        run_in_background(
+            self,
+            lambda progress: self.app.users.provision_csv(path, progress=progress),
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=on_progress,
+        )
+
     def _create_user(self):
+        if self._creating:
+            return
         username = self._new_username_var.get().strip()
         password = self._new_password_var.get().strip()
         is_admin = self._is_admin_var.get()
@@ -297,12 +462,20 @@ class AdminView(tk.Frame):
         if not password:
             messagebox.showwarning("Input Error", "Password cannot be empty.", parent=self)
             return
-        try:
-            self.app.users.create(username, password, is_admin=is_admin)
+
+        def on_done(_user):
+            self._creating = False
             self._new_username_var.set("")
             self._new_password_var.set("")
             self._is_admin_var.set(False)
-            self._load_users()
+            # The new row's place depends on the sort; re-read just the visible page.
+            self._reload()
             messagebox.showinfo("User Created", f"User '{username}' has been created.", parent=self)
-        except ValueError as e:
-            messagebox.showerror("Error", str(e), parent=self)
+
+        def on_error(exc):
+            self._creating = False
+            messagebox.showerror("Error", str(exc), parent=self)
+
+        self._creating = True
+        wait_for(self, self.app.users.submit(self.app.users.create, username, password, is_admin=is_admin),
+                 on_done=on_done, on_error=on_error)
@@ -0,0 +1,83 @@
+"""
+Helpers for running slow work off the Tk thread.
+Tk is not thread-safe, so workers only post events to a queue and the Tk
+thread drains it with after().
+"""
+import queue
+import threading
+
+
+def run_in_background(widget, work, on_done=None, on_error=None, on_progress=None, poll_ms=50):
+    """
+    Run work(progress) on a daemon thread. The worker may call progress(*args)
+    as often as it likes; on_progress only sees the latest call per poll.
+    on_done(result) / on_error(exc) run on the Tk thread. Nothing is delivered
+    if `widget` has been destroyed in the meantime.
+    """
+    events = queue.Queue()
+
+    def worker():
+        try:
+            result = work(lambda *args: events.put(("progress", args)))
+        except Exception as e:  # delivered to on_error on the Tk thread
+            events.put(("error", e))
+        else:
+            events.put(("done", result))
+
+    def poll():
+        if not widget.winfo_exists():
+            return
+        latest = None
+        while True:
+            try:
+                kind, payload = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest = payload
+                continue
+            if latest is not None and on_progress:
+                on_progress(*latest)
+            if kind == "done":
+                if on_done:
+                    on_done(payload)
+            elif on_error:
+                on_error(payload)
+            else:
+                raise payload
+            return
+        if latest is not None and on_progress:
+            on_progress(*latest)
+        widget.after(poll_ms, poll)
+
+    threading.Thread(target=worker, daemon=True).start()
+    widget.after(poll_ms, poll)
+
+
+def wait_for(widget, future, on_done=None, on_error=None, poll_ms=50):
+    """
+    Deliver a concurrent.futures.Future to the Tk thread: on_done(result) or
+    on_error(exc) runs once it settles. The window shows the busy cursor until
+    then. Nothing is delivered if `widget` has been destroyed in the meantime.
+    """
+    window = widget.winfo_toplevel()
+    window.configure(cursor="watch")
+
+    def poll():
+        if not future.done() and widget.winfo_exists():
+            widget.after(poll_ms, poll)
+            return
+        if window.winfo_exists():
+            window.configure(cursor="")
+        if not widget.winfo_exists():
+            return
+        exc = future.exception()
+        if exc is None:
+            if on_done:
+                on_done(future.result())
+        elif on_error:
+            on_error(exc)
+        else:
+            raise exc
+
+    widget.after(poll_ms, poll)
@@ -12,9 +12,28 @@ class DashboardView(tk.Frame):
         super().__init__(parent, bg=COLORS["bg"])
         self.app       = app
         self.main_view = main_view
+        self._refill_job = None
         self.pack(fill=tk.BOTH, expand=True)
         self._build()
 
+    def refresh(self, reason: str):
+        """Re-render after a change (see MainView.notify); bursts collapse into one."""
+        if reason == "shown" and self.app.db.data_version() == self._data_version:
+            return
+        if self._refill_job is None:
+            self._refill_job = self.after_idle(self._refill)
+
+    def _refill(self):
+        self._refill_job = None
+        for w in self._inner.winfo_children():
+            w.destroy()
+        self._fill(self._inner)
+
+    def destroy(self):
+        if self._refill_job is not None:
+            self.after_cancel(self._refill_job)
+        super().destroy()
+
     def _build(self):
         # Scrollable canvas wrapper
         canvas = tk.Canvas(self, bg=COLORS["bg"], highlightthickness=0)
@@ -36,11 +55,15 @@ class DashboardView(tk.Frame):
             lambda e: canvas.yview_scroll(-1 * (e.delta // 120), "units"),
         )
 
+        self._inner = inner
         self._fill(inner)
 
     def _fill(self, f):
+        self._data_version = self.app.db.data_version()
         user    = self.app.current_user
         vehicle = self.app.current_vehicle
+        snap    = self.app.mileage.dashboard_snapshot(
+            user.id, vehicle.id if vehicle else None)
 
         # ── greeting ──────────────────────────────────────────────────────────
         hdr = tk.Frame(f, bg=COLORS["bg"])
@@ -49,25 +72,23 @@ class DashboardView(tk.Frame):
                  font=("Segoe UI", 20, "bold"),
                  bg=COLORS["bg"], fg=COLORS["text"]).pack(anchor="w")
 
-        if not vehicle:
+        if not snap.selected:
             tk.Label(hdr,
                      text="No vehicle selected — head to Vehicles to add one.",
                      font=("Segoe UI", 11), bg=COLORS["bg"],
                      fg=COLORS["accent"]).pack(anchor="w", pady=(4, 0))
             return
 
-        tk.Label(hdr, text=f"Viewing: {vehicle.display_name()}",
+        selected = snap.selected
+        tk.Label(hdr, text=f"Viewing: {selected.vehicle.display_name()}",
                  font=("Segoe UI", 11), bg=COLORS["bg"],
                  fg=COLORS["muted"]).pack(anchor="w", pady=(3, 0))
 
         # ── stat cards ────────────────────────────────────────────────────────
-        total   = self.app.mileage.total_miles(vehicle.id)
-        count   = self.app.mileage.log_count(vehicle.id)
-        latest  = self.app.mileage.latest_odometer(vehicle.id)
-
+        latest = selected.latest_odometer
         stats = [
-            ("Total Miles Tracked", f"{total:,.1f}"),
-            ("Mileage Log Entries", str(count)),
+            ("Total Miles Tracked", f"{selected.total_miles:,.1f}"),
+            ("Mileage Log Entries", str(selected.log_count)),
             ("Latest Odometer",     f"{latest:,.1f}" if latest is not None else "—"),
         ]
 
@@ -93,7 +114,7 @@ class DashboardView(tk.Frame):
 
         # ── recent logs ───────────────────────────────────────────────────────
         self._section(f, "Recent Mileage Logs")
-        logs = self.app.mileage.get_logs(vehicle.id, limit=6)
+        logs = snap.recent_logs
         logs_f = tk.Frame(f, bg=COLORS["bg"])
         logs_f.pack(fill=tk.X, padx=24)
 
@@ -126,16 +147,16 @@ class DashboardView(tk.Frame):
 
         # ── all vehicles summary ───────────────────────────────────────────────
         self._section(f, "All Your Vehicles")
-        all_vehicles = self.app.vehicles.get_all_for_user(user.id)
         vf = tk.Frame(f, bg=COLORS["bg"])
         vf.pack(fill=tk.X, padx=24, pady=(0, 24))
 
-        if not all_vehicles:
+        if not snap.vehicles:
             tk.Label(vf, text="No vehicles added yet.",
                      font=("Segoe UI", 11), bg=COLORS["bg"],
                      fg=COLORS["muted"]).pack(anchor="w")
         else:
-            for v in all_vehicles:
+            for summary in snap.vehicles:
+                v = summary.vehicle
                 vr = RoundedPanel(
                     vf,
                     bg=COLORS["surface"],
@@ -147,14 +168,12 @@ class DashboardView(tk.Frame):
                 vr.pack(fill=tk.X, pady=3)
                 vr_body = vr.content
 
-                indicator = "▶ " if (self.app.current_vehicle and v.id == self.app.current_vehicle.id) else "    "
+                indicator = "▶ " if v.id == selected.vehicle.id else "    "
                 tk.Label(vr_body, text=f"{indicator}{v.display_name()}",
                          font=("Segoe UI", 11, "bold"),
                          bg=COLORS["surface"], fg=COLORS["text"]).pack(side=tk.LEFT)
 
-                v_miles = self.app.mileage.total_miles(v.id)
-                v_count = self.app.mileage.log_count(v.id)
-                tk.Label(vr_body, text=f"{v_miles:,.0f} mi tracked  ·  {v_count} logs",
+                tk.Label(vr_body, text=f"{summary.total_miles:,.0f} mi tracked  ·  {summary.log_count} logs",
                          font=("Segoe UI", 10),
                          bg=COLORS["surface"], fg=COLORS["muted"]).pack(side=tk.RIGHT)
 
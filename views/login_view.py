@@ -1,19 +1,36 @@
 """
 Login / user-selection screen shown at app start.
+
+Users are found by typing the start of their name: the list only ever holds
+the top SEARCH_LIMIT matches, fetched by a prefix search a moment after the
+last keystroke.
 """
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 from app import COLORS
+from views.background import wait_for
 from views.widgets import RoundedButton, RoundedPanel
 
 
 class LoginView(tk.Frame):
+    SEARCH_LIMIT = 20
+    SEARCH_DELAY_MS = 150
+
     def __init__(self, parent, app):
         super().__init__(parent, bg=COLORS["bg"])
         self.app = app
+        self._busy = False
+        self._users = []
+        self._search_job = None
         self.pack(fill=tk.BOTH, expand=True)
         self._build()
         self._load_users()
+        self._search_entry.focus_set()
+
+    def destroy(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        super().destroy()
 
     # ── layout ────────────────────────────────────────────────────────────────
 
@@ -44,8 +61,23 @@ class LoginView(tk.Frame):
         # ── Select existing user ──────────────────────────────────────────────
         tk.Label(card_body, text="Select User", font=("Segoe UI", 13, "bold"),
                  bg=COLORS["surface"], fg=COLORS["text"]).pack(anchor="w")
-        tk.Label(card_body, text="Double-click or select then press Login",
-                 font=("Segoe UI", 9), bg=COLORS["surface"], fg=COLORS["muted"]).pack(anchor="w", pady=(0, 8))
+        self._hint = tk.Label(card_body, text="", font=("Segoe UI", 9),
+                              bg=COLORS["surface"], fg=COLORS["muted"])
+        self._hint.pack(anchor="w", pady=(0, 8))
+
+        self._search_var = tk.StringVar()
+        self._search_entry = tk.Entry(card_body, textvariable=self._search_var,
+                                      bg=COLORS["input"], fg=COLORS["text"],
+                                      insertbackground=COLORS["text"],
+                                      font=("Segoe UI", 11), relief=tk.FLAT,
+                                      highlightthickness=1,
+                                      highlightbackground=COLORS["border"],
+                                      highlightcolor=COLORS["accent"],
+                                      bd=0)
+        self._search_entry.pack(fill=tk.X, ipady=6, ipadx=6, pady=(0, 8))
+        self._search_var.trace_add("write", lambda *_: self._schedule_search())
+        self._search_entry.bind("<Return>", lambda _: self._login_first_match())
+        self._search_entry.bind("<Down>", lambda _: self._focus_list())
 
         lb_wrap = RoundedPanel(
             card_body,
@@ -75,11 +107,13 @@ class LoginView(tk.Frame):
             font=("Segoe UI", 11), relief=tk.FLAT,
             highlightthickness=0,
             bd=0,
+            exportselection=False,   # keep the selection while typing in the search field
             yscrollcommand=sb.set,
         )
         self.listbox.pack(side=tk.LEFT, fill=tk.X, expand=True)
         sb.config(command=self.listbox.yview)
         self.listbox.bind("<Double-Button-1>", lambda _: self._login())
+        self.listbox.bind("<Return>", lambda _: self._login())
 
         RoundedButton(
             card_body,
@@ -94,6 +128,10 @@ class LoginView(tk.Frame):
             pad_y=8,
         ).pack(fill=tk.X, pady=(10, 0))
 
+        self._status = tk.Label(card_body, text="", font=("Segoe UI", 9),
+                                bg=COLORS["surface"], fg=COLORS["muted"])
+        self._status.pack(anchor="w", pady=(6, 0))
+
         # ── Divider ───────────────────────────────────────────────────────────
         tk.Frame(card_body, bg=COLORS["border"], height=1).pack(fill=tk.X, pady=18)
 
@@ -132,13 +170,55 @@ class LoginView(tk.Frame):
 
     # ── logic ─────────────────────────────────────────────────────────────────
 
+    def _schedule_search(self):
+        """Debounce typing: search once the field has been still for SEARCH_DELAY_MS."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._load_users)
+
     def _load_users(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        prefix = self._search_var.get()
+        # One extra row tells us whether there are more matches than we show.
+        users = self.app.users.search(prefix, limit=self.SEARCH_LIMIT + 1)
+        self._users = users[:self.SEARCH_LIMIT]
         self.listbox.delete(0, tk.END)
-        self._users = self.app.users.get_all()
         for u in self._users:
             self.listbox.insert(tk.END, f"  {u.username}")
 
+        if not self._users:
+            hint = f"No users start with '{prefix.strip()}'" if prefix.strip() else "No users yet — create one below"
+        elif len(users) > self.SEARCH_LIMIT:
+            hint = f"Showing the first {self.SEARCH_LIMIT} matches — keep typing to narrow"
+        else:
+            hint = "Type to search; double-click or select then press Login"
+        self._hint.configure(text=hint)
+
+    def _focus_list(self):
+        if self._users:
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+        return "break"
+
+    def _login_first_match(self):
+        if self._search_job is not None:   # Return pressed before the debounce fired
+            self._load_users()
+        if self._users and not self.listbox.curselection():
+            self.listbox.selection_set(0)
+        self._login()
+
+    def _set_busy(self, message: str):
+        """Show what the hash worker is doing; "" when it is idle again."""
+        self._busy = bool(message)
+        self._status.configure(text=message)
+
     def _login(self):
+        if self._busy:
+            return
         sel = self.listbox.curselection()
         if not sel:
             messagebox.showwarning("No Selection", "Please select a user to log in.", parent=self)
@@ -154,13 +234,24 @@ class LoginView(tk.Frame):
         if password is None:
             return
 
-        if not self.app.users.authenticate(user.id, password):
-            messagebox.showerror("Login Failed", "Incorrect password.", parent=self)
-            return
+        def on_done(ok):
+            self._set_busy("")
+            if not ok:
+                messagebox.showerror("Login Failed", "Incorrect password.", parent=self)
+                return
+            self.app.login(user)
 
-        self.app.login(user)
+        def on_error(exc):
+            self._set_busy("")
+            messagebox.showerror("Login Failed", str(exc), parent=self)
+
+        self._set_busy("Checking password…")
+        wait_for(self, self.app.users.submit(self.app.users.authenticate, user.id, password),
+                 on_done=on_done, on_error=on_error)
 
     def _create_user(self):
+        if self._busy:
+            return
         name = self.new_user_var.get().strip()
         if not name:
             messagebox.showwarning("Input Error", "Please enter a username.", parent=self)
@@ -189,9 +280,18 @@ class LoginView(tk.Frame):
             messagebox.showwarning("Input Error", "Password cannot be empty.", parent=self)
             return
 
-        try:
-            self.app.users.create(name, password)
+        def on_done(user):
+            self._set_busy("")
             self.new_user_var.set("")
+            # Show the new account, ready to log in.
+            self._search_var.set(user.username)
             self._load_users()
-        except ValueError as e:
-            messagebox.showerror("Error", str(e), parent=self)
+            self.listbox.selection_set(0)
+
+        def on_error(exc):
+            self._set_busy("")
+            messagebox.showerror("Error", str(exc), parent=self)
+
+        self._set_busy("Creating user…")
+        wait_for(self, self.app.users.submit(self.app.users.create, name, password),
+                 on_done=on_done, on_error=on_error)
@@ -3,15 +3,30 @@ MainView — persistent shell shown after login.
 Contains the sidebar navigation, top bar with vehicle selector,
 and a content area that swaps child views.
 
+Pages are built on first visit and then kept alive: switching pages only hides
+and shows them. Each page has a refresh(reason) method; notify(reason) calls it
+on the visible page at once and queues it for hidden pages until they are shown.
+Reasons:
+  "shown"     the page became visible again (check for outside changes)
+  "vehicle"   the selected vehicle changed
+  "vehicles"  vehicles were added, edited or deleted
+  "logs"      mileage logs were added, deleted or imported
+
 To add a new page:
   1. Add an entry to PAGES.
-  2. Add the matching import + elif branch in show_page().
+  2. Add the matching import + elif branch in _create_page().
+  3. Give the view a refresh(reason) method.
 """
+import logging
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 from app import COLORS
+from query_stats import format_report
+from views.background import wait_for
 from views.widgets import RoundedButton, RoundedPanel
 
+log = logging.getLogger(__name__)
+
 
 class MainView(tk.Frame):
     # ── Register pages here to extend the app ─────────────────────────────────
@@ -28,6 +43,10 @@ class MainView(tk.Frame):
         self._active_page = tk.StringVar(value="dashboard")
         self._nav_default_font = ("Segoe UI", 11)
         self._nav_active_font = ("Segoe UI", 11, "bold")
+        self._pages: dict[str, tk.Frame] = {}   # built pages, kept while logged in
+        self._pack_opts: dict[str, dict] = {}   # how each page packs itself
+        self._pending: dict[str, list] = {}     # refresh reasons queued while hidden
+        self._current = None
         self.pack(fill=tk.BOTH, expand=True)
         self._build()
         self.show_page("dashboard")
@@ -176,23 +195,33 @@ class MainView(tk.Frame):
         self._page_frame = tk.Frame(content, bg=COLORS["bg"])
         self._page_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.refresh_vehicle_selector()
+        self._select_vehicle()
 
     # ── vehicle selector ──────────────────────────────────────────────────────
 
     def refresh_vehicle_selector(self):
-        """Reload vehicle list from DB and update combobox."""
+        """Reload vehicle list from DB, update combobox and tell the pages."""
+        previous = self.app.current_vehicle.id if self.app.current_vehicle else None
+        self._select_vehicle()
+        self.notify("vehicles")
+        current = self.app.current_vehicle.id if self.app.current_vehicle else None
+        if current != previous:
+            self.notify("vehicle")
+
+    def _select_vehicle(self):
         self._vehicles = self.app.vehicles.get_all_for_user(self.app.current_user.id)
         if self._vehicles:
             names = [v.display_name() for v in self._vehicles]
             self._vehicle_combo.configure(values=names, state="readonly")
 
-            # Preserve selection if vehicle still exists
+            # Preserve selection if vehicle still exists (refreshing the object,
+            # which may have been edited)
             if self.app.current_vehicle:
                 ids = [v.id for v in self._vehicles]
                 if self.app.current_vehicle.id in ids:
                     idx = ids.index(self.app.current_vehicle.id)
                     self._vehicle_combo.current(idx)
+                    self.app.current_vehicle = self._vehicles[idx]
                     return
             self._vehicle_combo.current(0)
             self.app.current_vehicle = self._vehicles[0]
@@ -205,7 +234,7 @@ class MainView(tk.Frame):
         idx = self._vehicle_combo.current()
         if self._vehicles and idx >= 0:
             self.app.current_vehicle = self._vehicles[idx]
-            self.show_page(self._active_page.get())
+            self.notify("vehicle")
 
     def _change_password(self):
         new_password = simpledialog.askstring(
@@ -227,11 +256,12 @@ class MainView(tk.Frame):
         if new_password != confirm_password:
             messagebox.showerror("Password Error", "Passwords do not match.", parent=self)
             return
-        try:
-            self.app.users.set_password(self.app.current_user.id, new_password)
-            messagebox.showinfo("Password Updated", "Password updated.", parent=self)
-        except ValueError as e:
-            messagebox.showerror("Password Error", str(e), parent=self)
+        wait_for(
+            self,
+            self.app.users.submit(self.app.users.set_password, self.app.current_user.id, new_password),
+            on_done=lambda _: messagebox.showinfo("Password Updated", "Password updated.", parent=self),
+            on_error=lambda e: messagebox.showerror("Password Error", str(e), parent=self),
+        )
 
     def _delete_user_account(self):
         user = self.app.current_user
@@ -264,7 +294,13 @@ class MainView(tk.Frame):
             messagebox.showerror("Delete User Error", "Passwords do not match.", parent=self)
             return
 
-        if not self.app.users.authenticate(user.id, password):
+        wait_for(self, self.app.users.submit(self.app.users.authenticate, user.id, password),
+                 on_done=self._confirm_delete_user_account,
+                 on_error=lambda e: messagebox.showerror("Delete User Error", str(e), parent=self))
+
+    def _confirm_delete_user_account(self, authenticated: bool):
+        user = self.app.current_user
+        if not authenticated:
             messagebox.showerror("Delete User Error", "Incorrect password.", parent=self)
             return
 
@@ -276,12 +312,16 @@ class MainView(tk.Frame):
             return
 
         self.app.users.delete(user.id)
+        self.app.purge_deleted()
         messagebox.showinfo("User Deleted", "User and all associated data were deleted.", parent=self)
         self.app.logout()
 
     # ── page switching ────────────────────────────────────────────────────────
 
     def show_page(self, page_id: str):
+        stats = self.app.db.stats
+        if stats:
+            stats.reset()
         self._active_page.set(page_id)
 
         # Highlight active nav button
@@ -306,20 +346,55 @@ class MainView(tk.Frame):
         titles = {p[1]: p[0] for p in self.PAGES}
         self._page_title.configure(text=titles.get(page_id, page_id.title()))
 
-        for w in self._page_frame.winfo_children():
-            w.destroy()
+        previous, self._current = self._current, page_id
+        if previous is not None and previous != page_id:
+            self._pages[previous].pack_forget()
 
+        page = self._pages.get(page_id)
+        if page is None:
+            page = self._create_page(page_id)
+            self._pages[page_id] = page
+            self._pack_opts[page_id] = page.pack_info()
+        else:
+            if previous != page_id:
+                page.pack(**self._pack_opts[page_id])
+            for reason in self._pending.pop(page_id, []) + ["shown"]:
+                page.refresh(reason)
+
+        if stats:
+            count, total_ms = stats.totals()
+            log.info("page %s: %d queries, %.1f ms\n%s",
+                     page_id, count, total_ms, format_report(stats.snapshot()))
+
+    def _create_page(self, page_id: str) -> tk.Frame:
         # ── route ─────────────────────────────────────────────────────────────
         if page_id == "dashboard":
             from views.dashboard_view import DashboardView
-            DashboardView(self._page_frame, self.app, self)
-        elif page_id == "vehicles":
+            return DashboardView(self._page_frame, self.app, self)
+        if page_id == "vehicles":
             from views.vehicles_view import VehiclesView
-            VehiclesView(self._page_frame, self.app, self)
-        elif page_id == "mileage":
+            return VehiclesView(self._page_frame, self.app, self)
+        if page_id == "mileage":
             from views.mileage_view import MileageView
-            MileageView(self._page_frame, self.app, self)
-        elif page_id == "admin":
+            return MileageView(self._page_frame, self.app, self)
+        if page_id == "admin":
             from views.admin_view import AdminView
-            AdminView(self._page_frame, self.app, self)
+            return AdminView(self._page_frame, self.app, self)
         # Add new pages here ↑
+        raise ValueError(f"Unknown page '{page_id}'.")
+
+    def notify(self, reason: str, sender=None):
+        """
+        Tell the pages that something changed. The visible page refreshes now,
+        hidden ones when they are next shown. `sender` (a page that has already
+        updated itself) is skipped.
+        """
+        for page_id, page in self._pages.items():
+            if page is sender:
+                continue
+            if page_id == self._current:
+                page.refresh(reason)
+            else:
+                pending = self._pending.setdefault(page_id, [])
+                if reason not in pending:
+                    pending.append(reason)
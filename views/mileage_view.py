@@ -2,23 +2,59 @@
 Mileage Log — add entries and view full history for the selected vehicle.
 """
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import messagebox, filedialog
 from datetime import date
 from app import COLORS
+from views.background import run_in_background
+from views.virtual_tree import VirtualTreeview
 from views.widgets import RoundedButton, RoundedPanel
 
 
 class MileageView(tk.Frame):
+    SEARCH_DELAY_MS = 250   # wait for a pause in typing before querying
+
     def __init__(self, parent, app, main_view):
         super().__init__(parent, bg=COLORS["bg"])
         self.app       = app
         self.main_view = main_view
+        self._search_job = None
         self.pack(fill=tk.BOTH, expand=True)
         self._build()
 
+    def refresh(self, reason: str):
+        """Follow the selected vehicle and outside changes (see MainView.notify)."""
+        vehicle = self.app.current_vehicle
+        if (vehicle.id if vehicle else None) != self._vehicle_id:
+            self._show_vehicle()
+        elif vehicle is None:
+            return
+        elif reason == "vehicles":
+            self._vehicle_label.configure(text=f"Vehicle: {vehicle.display_name()}")
+        elif reason == "logs" or (reason == "shown" and self._stale()):
+            self._load_history()
+
+    def _show_vehicle(self):
+        vehicle = self.app.current_vehicle
+        if vehicle is None or self._vehicle_id is None:
+            # Switching to or from the "no vehicle" placeholder: rebuild
+            if self._search_job is not None:
+                self.after_cancel(self._search_job)
+                self._search_job = None
+            for w in self.winfo_children():
+                w.destroy()
+            self._build()
+            return
+        self._vehicle_id = vehicle.id
+        self._vehicle_label.configure(text=f"Vehicle: {vehicle.display_name()}")
+        self._odo_var.set("")
+        self._prefill_odometer()
+        self._history.clear_selection()
+        self._load_history()
+
     # ── layout ────────────────────────────────────────────────────────────────
 
     def _build(self):
+        self._vehicle_id = self.app.current_vehicle.id if self.app.current_vehicle else None
         if not self.app.current_vehicle:
             tk.Label(self,
                      text="No vehicle selected.\nGo to Vehicles to add or select one.",
@@ -34,9 +70,10 @@ class MileageView(tk.Frame):
         top = tk.Frame(self, bg=COLORS["bg"])
         top.pack(fill=tk.X, padx=22, pady=18)
 
-        tk.Label(top, text=f"Vehicle: {veh.display_name()}",
-                 font=("Segoe UI", 11), bg=COLORS["bg"],
-                 fg=COLORS["muted"]).pack(anchor="w", pady=(0, 8))
+        self._vehicle_label = tk.Label(top, text=f"Vehicle: {veh.display_name()}",
+                                       font=("Segoe UI", 11), bg=COLORS["bg"],
+                                       fg=COLORS["muted"])
+        self._vehicle_label.pack(anchor="w", pady=(0, 8))
 
         card = RoundedPanel(
             top,
@@ -80,10 +117,7 @@ class MileageView(tk.Frame):
              bg=COLORS["surface"], fg=COLORS["muted"]).pack(anchor="w")
         self._odo_var = tk.StringVar()
 
-        # Pre-fill with latest + 1 as a hint
-        latest = self.app.mileage.latest_odometer(self.app.current_vehicle.id)
-        if latest is not None:
-            self._odo_var.set(f"{latest:.0f}")
+        self._prefill_odometer()
 
         tk.Entry(of, textvariable=self._odo_var,
                  bg=COLORS["input"], fg=COLORS["text"],
@@ -125,6 +159,12 @@ class MileageView(tk.Frame):
             pad_y=8,
         ).pack(side=tk.LEFT, anchor="s")
 
+    def _prefill_odometer(self):
+        # Pre-fill with latest + 1 as a hint
+        latest = self.app.mileage.latest_odometer(self.app.current_vehicle.id)
+        if latest is not None:
+            self._odo_var.set(f"{latest:.0f}")
+
     def _build_history(self):
         bottom = tk.Frame(self, bg=COLORS["bg"])
         bottom.pack(fill=tk.BOTH, expand=True, padx=22, pady=(0, 18))
@@ -134,6 +174,22 @@ class MileageView(tk.Frame):
         tk.Label(hdr, text="Mileage History",
                  font=("Segoe UI", 13, "bold"),
                  bg=COLORS["bg"], fg=COLORS["text"]).pack(side=tk.LEFT)
+
+        # Note search across all of the user's vehicles, debounced while typing
+        self._search_var = tk.StringVar()
+        tk.Label(hdr, text="Search notes",
+                 font=("Segoe UI", 9),
+                 bg=COLORS["bg"], fg=COLORS["muted"]).pack(side=tk.LEFT, padx=(18, 6))
+        tk.Entry(hdr, textvariable=self._search_var,
+                 bg=COLORS["input"], fg=COLORS["text"],
+                 insertbackground=COLORS["text"],
+                 font=("Segoe UI", 10), relief=tk.FLAT, width=24,
+                 highlightthickness=1,
+                 highlightbackground=COLORS["border"],
+                 highlightcolor=COLORS["accent"],
+                 bd=0).pack(side=tk.LEFT, ipady=4, ipadx=6)
+        self._search_var.trace_add("write", lambda *_: self._schedule_search())
+
         RoundedButton(
             hdr,
             text="Delete Selected",
@@ -147,6 +203,37 @@ class MileageView(tk.Frame):
             pad_x=12,
             pad_y=6,
         ).pack(side=tk.RIGHT)
+        self._import_btn = RoundedButton(
+            hdr,
+            text="Import…",
+            command=self._import_logs,
+            bg=COLORS["surface_alt"],
+            fg=COLORS["button_text"],
+            hover_bg=COLORS["card"],
+            active_bg=COLORS["card"],
+            font=("Segoe UI", 10),
+            radius=10,
+            pad_x=12,
+            pad_y=6,
+        )
+        self._import_btn.pack(side=tk.RIGHT, padx=(0, 8))
+        self._export_btn = RoundedButton(
+            hdr,
+            text="Export…",
+            command=self._export_logs,
+            bg=COLORS["surface_alt"],
+            fg=COLORS["button_text"],
+            hover_bg=COLORS["card"],
+            active_bg=COLORS["card"],
+            font=("Segoe UI", 10),
+            radius=10,
+            pad_x=12,
+            pad_y=6,
+        )
+        self._export_btn.pack(side=tk.RIGHT, padx=(0, 8))
+        self._status = tk.Label(hdr, text="", font=("Segoe UI", 9),
+                                bg=COLORS["bg"], fg=COLORS["muted"])
+        self._status.pack(side=tk.RIGHT, padx=(0, 10))
 
         tree_wrap = RoundedPanel(
             bottom,
@@ -160,36 +247,75 @@ class MileageView(tk.Frame):
         tree_wrap.pack(fill=tk.BOTH, expand=True)
         tree_body = tree_wrap.content
 
-        cols = ("date", "odometer", "notes")
-        self._tree = ttk.Treeview(tree_body, columns=cols,
-                                  show="headings", selectmode="browse")
+        # Only the visible rows live in Tk; history is paged in by cursor on scroll
+        cols = ("date", "vehicle", "odometer", "notes")
+        self._history = VirtualTreeview(tree_body, columns=cols)
+        self._tree = self._history.tree
 
         self._tree.heading("date",     text="Date",              anchor="center")
+        self._tree.heading("vehicle",  text="Vehicle",           anchor="w")
         self._tree.heading("odometer", text="Odometer (mi)",     anchor="center")
         self._tree.heading("notes",    text="Notes",             anchor="w")
 
         self._tree.column("date",     width=130, anchor="center", stretch=False)
+        self._tree.column("vehicle",  width=140, anchor="w",      stretch=False)
         self._tree.column("odometer", width=160, anchor="center", stretch=False)
         self._tree.column("notes",    width=500, anchor="w")
 
-        vsb = ttk.Scrollbar(tree_body, orient="vertical", command=self._tree.yview)
-        self._tree.configure(yscrollcommand=vsb.set)
-
-        self._tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self._history.pack(fill=tk.BOTH, expand=True)
 
         self._load_history()
 
     # ── logic ─────────────────────────────────────────────────────────────────
 
     def _load_history(self):
-        self._tree.delete(*self._tree.get_children())
-        self._logs = self.app.mileage.get_logs(self.app.current_vehicle.id)
-        for log in self._logs:
-            self._tree.insert("", "end", iid=str(log.id),
-                              values=(log.date,
-                                      f"{log.odometer_reading:,.1f}",
-                                      log.notes))
+        self._data_version = self.app.db.data_version()
+        query = self._search_var.get().strip()
+        if query:
+            # Search results span vehicles, so show which one each hit is from
+            self._tree.configure(displaycolumns=("date", "vehicle", "odometer", "notes"))
+            hits = self.app.mileage.search_notes(self.app.current_user.id, query)
+            self._history.set_rows(
+                (hit.log.id, (hit.log.date, hit.vehicle_name,
+                              f"{hit.log.odometer_reading:,.1f}", hit.snippet))
+                for hit in hits
+            )
+            self._status.configure(text=f"{len(hits)} match{'es' if len(hits) != 1 else ''}")
+            return
+
+        self._tree.configure(displaycolumns=("date", "odometer", "notes"))
+        self._status.configure(text="")
+        mileage    = self.app.mileage
+        vehicle_id = self.app.current_vehicle.id
+        self._history.set_source(
+            lambda after=None, before=None, limit=50: mileage.get_logs_page(
+                vehicle_id, after=after, before=before, limit=limit),
+            lambda offset: mileage.cursor_at(vehicle_id, offset),
+            self._history_row,
+        )
+
+    def _stale(self) -> bool:
+        """True when another app instance changed the database since the last load."""
+        return self.app.db.data_version() != self._data_version
+
+    @staticmethod
+    def _history_row(log):
+        values = (log.date, "", f"{log.odometer_reading:,.1f}", log.notes)
+        return str(log.id), values, log.cursor
+
+    def _schedule_search(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_job = None
+        self._load_history()
+
+    def destroy(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        super().destroy()
 
     def _add_log(self):
         date_s  = self._date_var.get().strip()
@@ -209,19 +335,103 @@ class MileageView(tk.Frame):
             return
 
         try:
-            self.app.mileage.add(self.app.current_vehicle.id, odometer, date_s, notes)
+            log = self.app.mileage.add(self.app.current_vehicle.id, odometer, date_s, notes)
             self._odo_var.set("")
             self._notes_var.set("")
-            self._load_history()
+            if self._search_var.get().strip() or self._stale():
+                self._load_history()
+            else:
+                self._history.insert_row(log)
+            self.main_view.notify("logs", sender=self)
         except ValueError as e:
             messagebox.showerror("Error", str(e), parent=self)
 
     def _delete_log(self):
-        sel = self._tree.selection()
-        if not sel:
+        log_id = self._history.selected_id
+        if log_id is None:
             messagebox.showwarning("No Selection", "Select a log entry to delete.", parent=self)
             return
         if not messagebox.askyesno("Confirm", "Delete this mileage entry?", parent=self):
             return
-        self.app.mileage.delete(int(sel[0]))
-        self._load_history()
+        self.app.mileage.delete(int(log_id))
+        if self._stale():
+            self._load_history()
+        else:
+            self._history.remove_row(log_id)
+        self.main_view.notify("logs", sender=self)
+
+    def _import_logs(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Import Mileage Logs",
+            filetypes=[("CSV or JSON", "*.csv *.json *.jsonl *.ndjson"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        vehicle_id = self.app.current_vehicle.id
+        self._import_btn.set_disabled(True)
+        self._status.configure(text="Importing…")
+
+        def on_progress(imported, skipped, fraction):
+            self._status.configure(text=f"Importing… {fraction:.0%} ({imported:,} rows)")
+
+        def on_done(result):
+            self._import_btn.set_disabled(False)
+            self._status.configure(text="")
+            self._load_history()
+            self.main_view.notify("logs", sender=self)
+            message = f"Imported {result.imported:,} entries."
+            if result.skipped:
+                message += f"\nSkipped {result.skipped:,} invalid rows:\n\n" + "\n".join(result.errors[:10])
+            messagebox.showinfo("Import Complete", message, parent=self)
+
+        def on_error(exc):
+            self._import_btn.set_disabled(False)
+            self._status.configure(text="")
+            messagebox.showerror("Import Failed", str(exc), parent=self)
+
+        run_in_background(
+            self,
+            lambda progress: self.app.imports.import_logs(path, vehicle_id=vehicle_id, progress=progress),
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=on_progress,
+        )
+
+    def _export_logs(self):
+        vehicle = self.app.current_vehicle
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Mileage Logs",
+            defaultextension=".csv",
+            initialfile=f"{vehicle.name}.csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+        self._export_btn.set_disabled(True)
+        self._status.configure(text="Exporting…")
+
+        def on_progress(count, fraction):
+            # fraction is None when the row total is unknown (e.g. stale stats).
+            done = f"{fraction:.0%} " if fraction is not None else ""
+            self._status.configure(text=f"Exporting… {done}({count:,} rows)")
+
+        def on_done(count):
+            self._export_btn.set_disabled(False)
+            self._status.configure(text="")
+            messagebox.showinfo("Export Complete", f"Exported {count:,} entries.", parent=self)
+
+        def on_error(exc):
+            self._export_btn.set_disabled(False)
+            self._status.configure(text="")
+            messagebox.showerror("Export Failed", str(exc), parent=self)
+
+        run_in_background(
+            self,
+            lambda progress: self.app.exports.export_logs(
+                path, scope="vehicle", scope_id=vehicle.id, progress=progress),
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=on_progress,
+        )
@@ -1,6 +1,7 @@
 """
 Vehicles — add, edit, delete vehicles for the current user.
 """
+import bisect
 import tkinter as tk
 from tkinter import messagebox
 from app import COLORS
@@ -181,10 +182,32 @@ class VehiclesView(tk.Frame):
 
     def _load_list(self):
         self._listbox.delete(0, tk.END)
+        self._data_version = self.app.db.data_version()
         self._vehicles = self.app.vehicles.get_all_for_user(self.app.current_user.id)
         for v in self._vehicles:
             self._listbox.insert(tk.END, f"  {v.display_name()}")
 
+    def refresh(self, reason: str):
+        """Only outside changes matter here; this page applies its own edits."""
+        if reason == "shown" and self._stale():
+            self._load_list()
+
+    def _stale(self) -> bool:
+        """True when another app instance changed the database since the last load."""
+        return self.app.db.data_version() != self._data_version
+
+    # Targeted updates after our own edits; _vehicles stays sorted like the query.
+
+    def _insert_vehicle(self, vehicle):
+        index = bisect.bisect([(v.name, v.id) for v in self._vehicles], (vehicle.name, vehicle.id))
+        self._vehicles.insert(index, vehicle)
+        self._listbox.insert(index, f"  {vehicle.display_name()}")
+
+    def _remove_vehicle(self, vehicle_id: int):
+        index = next(i for i, v in enumerate(self._vehicles) if v.id == vehicle_id)
+        del self._vehicles[index]
+        self._listbox.delete(index)
+
     def _on_select(self, _event):
         sel = self._listbox.curselection()
         if not sel:
@@ -223,14 +246,20 @@ class VehiclesView(tk.Frame):
 
         try:
             if self._editing:
-                self.app.vehicles.update(self._editing.id, name, make, model, year, license_plate)
+                vehicle = self.app.vehicles.update(self._editing.id, name, make, model, year, license_plate)
                 messagebox.showinfo("Saved", "Vehicle updated successfully.", parent=self)
             else:
-                self.app.vehicles.create(self.app.current_user.id, name, make, model, year, license_plate)
+                vehicle = self.app.vehicles.create(self.app.current_user.id, name, make, model, year, license_plate)
                 messagebox.showinfo("Saved", "Vehicle added successfully.", parent=self)
 
+            editing = self._editing
             self._clear_form()
-            self._load_list()
+            if self._stale():
+                self._load_list()
+            else:
+                if editing:
+                    self._remove_vehicle(editing.id)
+                self._insert_vehicle(vehicle)
             self.main_view.refresh_vehicle_selector()
         except ValueError as e:
             messagebox.showerror("Error", str(e), parent=self)
@@ -248,8 +277,12 @@ class VehiclesView(tk.Frame):
         ):
             return
         self.app.vehicles.delete(v.id)
+        self.app.purge_deleted()
         if self.app.current_vehicle and self.app.current_vehicle.id == v.id:
             self.app.current_vehicle = None
         self._clear_form()
-        self._load_list()
+        if self._stale():
+            self._load_list()
+        else:
+            self._remove_vehicle(v.id)
         self.main_view.refresh_vehicle_selector()
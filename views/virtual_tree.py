@@ -0,0 +1,244 @@
+"""
+VirtualTreeview — a Treeview that only holds the rows on screen.
+
+Rows come either from a keyset-paged source (fetch_page / seek, e.g. the mileage
+history or the admin user table) or from an in-memory list. A small buffer of
+rows around the visible window is kept; scrolling extends it a page at a time
+from the cursor of its first or last row, and a jump (dragging the scrollbar)
+seeks to the target offset. The scrollbar is driven by the row offset, not by
+Tk, so it reflects the full data set while Tk only ever holds one screenful of
+items.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview(tk.Frame):
+    BUFFER_PAGES = 3   # rows kept around the window, in screenfuls
+
+    def __init__(self, parent, columns, **tree_options):
+        super().__init__(parent, bg=parent.cget("bg"))
+        self.tree = ttk.Treeview(self, columns=columns, show="headings",
+                                 selectmode="browse", **tree_options)
+        self._vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self._fetch_page = None     # fetch_page(after=, before=, limit=) -> page with .rows, .total
+        self._seek = None           # seek(offset) -> cursor of the row before `offset`
+        self._row_values = None     # row -> (iid, values, cursor)
+        self._static = False
+        self._total = 0
+        self._offset = 0            # index of the first visible row
+        self._buffer: list = []     # (iid, values, cursor) for rows _buf_start..
+        self._buf_start = 0
+        self._visible = 1
+        self._selected = None
+
+        self.tree.bind("<Configure>", self._on_resize)
+        # Windows reports wheel deltas in multiples of 120, macOS in small
+        # steps; go by the sign. X11 sends Button-4/5 instead.
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3) if e.delta else None)
+        self.tree.bind("<Button-4>", lambda _: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda _: self.scroll(3))
+        self.tree.bind("<Prior>", lambda _: self._key_scroll(-self._visible))
+        self.tree.bind("<Next>", lambda _: self._key_scroll(self._visible))
+        self.tree.bind("<Up>", lambda _: self._step(-1))
+        self.tree.bind("<Down>", lambda _: self._step(1))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    # ── data sources ──────────────────────────────────────────────────────────
+
+    def set_source(self, fetch_page, seek, row_values):
+        """Page rows by cursor; row_values(row) returns (iid, values, cursor)."""
+        self._fetch_page, self._seek, self._row_values = fetch_page, seek, row_values
+        self._static = False
+        self._offset = 0
+        self._selected = None
+        self.reload()
+
+    def set_rows(self, rows):
+        """Show an in-memory list of (iid, values) pairs."""
+        self._fetch_page = self._seek = self._row_values = None
+        self._static = True
+        self._buffer = [(str(iid), values, None) for iid, values in rows]
+        self._buf_start = 0
+        self._total = len(self._buffer)
+        self._offset = 0
+        self._selected = None
+        self._render()
+
+    def reload(self):
+        """Re-read the visible window from the source, keeping the scroll position."""
+        if self._static:
+            self._render()
+            return
+        self._buffer, self._buf_start = [], 0
+        self._fill(self._offset)
+
+    def insert_row(self, row):
+        """Show a newly added source row without re-reading the window."""
+        if not self._buffer:
+            self.reload()
+            return
+        entry = self._row_values(row)
+        cursor = entry[2]
+        pos = next((i for i, e in enumerate(self._buffer) if e[2] < cursor), len(self._buffer))
+        if pos == 0 and self._buf_start > 0:
+            self._buf_start += 1    # lands above the buffer
+        elif pos < len(self._buffer) or self._buf_start + len(self._buffer) >= self._total:
+            self._buffer.insert(pos, entry)
+        self._total += 1
+        self._fill(self._offset)
+
+    def update_row(self, row):
+        """Redraw one edited source row where it is; its position is not re-sorted."""
+        entry = self._row_values(row) if self._row_values else (str(row[0]), row[1], None)
+        index = next((i for i, e in enumerate(self._buffer) if e[0] == entry[0]), None)
+        if index is None:
+            return
+        self._buffer[index] = entry
+        if self.tree.exists(entry[0]):
+            self.tree.item(entry[0], values=entry[1])
+
+    def remove_row(self, iid):
+        """Drop a deleted row; falls back to reload() if it is not buffered."""
+        iid = str(iid)
+        if self._selected == iid:
+            self._selected = None
+        index = next((i for i, e in enumerate(self._buffer) if e[0] == iid), None)
+        if index is None:
+            self.reload()
+            return
+        del self._buffer[index]
+        self._total -= 1
+        self._fill(max(0, min(self._offset, self._total - self._visible)))
+
+    def clear_selection(self):
+        self._selected = None
+        self.tree.selection_set(())
+
+    @property
+    def selected_id(self) -> str | None:
+        """iid of the selected row, even while it is scrolled out of view."""
+        return self._selected
+
+    def __len__(self) -> int:
+        return self._total
+
+    # ── scrolling ─────────────────────────────────────────────────────────────
+
+    def scroll(self, rows: int):
+        self.scroll_to(self._offset + rows)
+
+    def scroll_to(self, offset: int):
+        offset = max(0, min(offset, self._total - self._visible))
+        if offset != self._offset or not self.tree.get_children():
+            self._fill(offset)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self._total))
+        elif unit == "pages":
+            self.scroll(int(amount) * self._visible)
+        else:
+            self.scroll(int(amount))
+
+    def _key_scroll(self, rows: int):
+        self.scroll(rows)
+        return "break"
+
+    def _step(self, delta: int):
+        """Arrow keys: move the selection, scrolling when it leaves the window."""
+        items = self.tree.get_children()
+        if not items:
+            return "break"
+        index = items.index(self._selected) if self._selected in items else -1
+        target = index + delta
+        if target < 0:
+            self.scroll(target)
+            target = 0
+        elif target >= len(items):
+            self.scroll(target - len(items) + 1)
+            target = len(items) - 1
+        items = self.tree.get_children()
+        if items:
+            self.tree.selection_set(items[max(0, min(target, len(items) - 1))])
+        return "break"
+
+    def _on_resize(self, event):
+        height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - height) // height)  # minus the heading row
+        if visible != self._visible:
+            self._visible = visible
+            self._fill(max(0, min(self._offset, self._total - visible)))
+
+    def _on_select(self, _event):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = selection[0]
+
+    # ── buffer ────────────────────────────────────────────────────────────────
+
+    def _fill(self, offset: int):
+        """Make sure rows offset..offset+visible are buffered, then draw them."""
+        if not self._static:
+            self._ensure(offset, offset + self._visible)
+            clamped = max(0, min(offset, self._total - self._visible))
+            if clamped != offset:  # the data shrank under us
+                offset = clamped
+                self._ensure(offset, offset + self._visible)
+        self._offset = offset
+        self._render()
+
+    def _ensure(self, start: int, end: int):
+        buf_end = self._buf_start + len(self._buffer)
+        prefetch = self._visible
+        limit = self._visible * self.BUFFER_PAGES
+        if self._buffer and self._buf_start <= start and end <= buf_end:
+            return
+        if self._buffer and self._buf_start <= start <= buf_end:
+            # Scrolled forward past the buffer: extend after its last row.
+            page = self._fetch_page(after=self._buffer[-1][2], limit=end - buf_end + prefetch)
+            self._buffer.extend(self._row_values(r) for r in page.rows)
+            self._total = page.total
+            drop = max(0, len(self._buffer) - limit)
+            del self._buffer[:drop]
+            self._buf_start += drop
+        elif self._buffer and start < self._buf_start <= end:
+            # Scrolled back before the buffer: extend before its first row.
+            count = self._buf_start - start + prefetch
+            page = self._fetch_page(before=self._buffer[0][2], limit=count)
+            rows = [self._row_values(r) for r in page.rows]
+            self._buffer[:0] = rows
+            self._buf_start -= len(rows)
+            self._total = page.total
+            del self._buffer[limit:]
+        else:
+            # Jump: find the cursor just before the target with an index-only seek.
+            start = max(0, start - prefetch)
+            after = self._seek(start - 1) if start else None
+            if start and after is None:
+                # Past the end: just refresh the total so _fill can clamp.
+                self._buffer, self._buf_start = [], 0
+                self._total = self._fetch_page(limit=1).total
+                return
+            page = self._fetch_page(after=after, limit=end - start + prefetch)
+            self._buffer = [self._row_values(r) for r in page.rows]
+            self._buf_start = start
+            self._total = page.total
+
+    def _render(self):
+        start = self._offset - self._buf_start
+        window = self._buffer[max(0, start):max(0, start) + self._visible]
+        self.tree.delete(*self.tree.get_children())
+        for iid, values, _cursor in window:
+            self.tree.insert("", "end", iid=iid, values=values)
+        if self._selected is not None and self.tree.exists(self._selected):
+            self.tree.selection_set(self._selected)
+
+        if self._total:
+            first = self._offset / self._total
+            self._vsb.set(first, min(1.0, first + len(window) / self._total))
+        else:
+            self._vsb.set(0.0, 1.0)
@@ -1,6 +1,34 @@
 import tkinter as tk
 from tkinter import font as tkfont
 
+# ── shared font metrics ───────────────────────────────────────────────────────
+# Canvas text items take the font description itself (Tk caches the actual
+# font), so Font objects are only needed for measuring. One per description
+# is kept for the process, along with the measurements already taken.
+_FONTS: dict = {}
+_TEXT_WIDTHS: dict = {}
+
+
+def _font_key(font):
+    return tuple(font) if isinstance(font, (list, tuple)) else font
+
+
+def _font_metrics(font) -> tkfont.Font:
+    key = _font_key(font)
+    measurer = _FONTS.get(key)
+    if measurer is None:
+        measurer = _FONTS[key] = tkfont.Font(font=font)
+    return measurer
+
+
+def text_size(font, text: str) -> tuple[int, int]:
+    """(width, line height) of `text` in `font`, cached per font and text."""
+    key = (_font_key(font), text)
+    width = _TEXT_WIDTHS.get(key)
+    if width is None:
+        width = _TEXT_WIDTHS[key] = _font_metrics(font).measure(text)
+    return width, _font_metrics(font).metrics("linespace")
+
 
 class RoundedPanel(tk.Canvas):
     def __init__(
@@ -34,9 +62,21 @@ class RoundedPanel(tk.Canvas):
             window=self.content,
         )
 
+        # One polygon for the life of the panel; resizes only move its points.
+        self._shape_id = self.create_polygon(
+            self._rounded_points(1, 1, 9, 9, 4),
+            smooth=True,
+            fill=self._fill,
+            outline=self._border,
+            width=1,
+        )
+        self.tag_lower(self._shape_id)
+        self._size = None           # size the shape was last laid out for
+        self._pending_size = None   # latest <Configure> size, applied when idle
+        self._layout_job = None
+
         self.bind("<Configure>", self._on_configure)
         self.content.bind("<Configure>", self._on_content_configure)
-        self._draw(10, 10)
 
     def _rounded_points(self, x1, y1, x2, y2, radius):
         return [
@@ -67,25 +107,22 @@ class RoundedPanel(tk.Canvas):
         ]
 
     def _draw(self, width, height):
-        self.delete("bg_shape")
         r = max(4, min(self._radius, width // 2, height // 2))
-        points = self._rounded_points(1, 1, width - 1, height - 1, r)
-        self.create_polygon(
-            points,
-            smooth=True,
-            fill=self._fill,
-            outline=self._border,
-            width=1,
-            tags="bg_shape",
-        )
-        self.tag_lower("bg_shape")
+        self.coords(self._shape_id, self._rounded_points(1, 1, width - 1, height - 1, r))
 
     def _on_configure(self, event):
-        width = max(8, event.width)
-        height = max(8, event.height)
+        # A window resize sends a burst of these; lay out once per idle cycle.
+        self._pending_size = (max(8, event.width), max(8, event.height))
+        if self._layout_job is None:
+            self._layout_job = self.after_idle(self._apply_size)
+
+    def _apply_size(self):
+        self._layout_job = None
+        if self._pending_size == self._size:
+            return
+        self._size = width, height = self._pending_size
         self._draw(width, height)
 
-        self.coords(self._window_id, self._pad_x, self._pad_y)
         inner_w = max(1, width - (self._pad_x * 2))
         if self._stretch_content:
             inner_h = max(1, height - (self._pad_y * 2))
@@ -102,7 +139,15 @@ class RoundedPanel(tk.Canvas):
 
         current_w = max(1, self.winfo_width())
         target_w = max(current_w, desired_w)
-        self.configure(width=target_w, height=desired_h)
+        # Re-requesting the same size would only queue another <Configure>.
+        if (target_w, desired_h) != (self.winfo_reqwidth(), self.winfo_reqheight()):
+            self.configure(width=target_w, height=desired_h)
+
+    def destroy(self):
+        if self._layout_job is not None:
+            self.after_cancel(self._layout_job)
+            self._layout_job = None
+        super().destroy()
 
 
 class RoundedButton(tk.Canvas):
@@ -123,9 +168,8 @@ class RoundedButton(tk.Canvas):
         width=None,
         cursor="hand2",
     ):
-        self._font = tkfont.Font(font=font)
-        text_width = self._font.measure(text)
-        text_height = self._font.metrics("linespace")
+        self._font = _font_key(font)
+        text_width, text_height = text_size(font, text)
 
         self._height = (pad_y * 2) + text_height
         self._width = width if width is not None else (pad_x * 2) + text_width
@@ -155,7 +199,7 @@ class RoundedButton(tk.Canvas):
         self._shape_id = None
         self._text_id = None
 
-        self._draw(self._normal_bg)
+        self._draw()
 
         self.bind("<Enter>", self._on_enter)
         self.bind("<Leave>", self._on_leave)
@@ -191,84 +235,92 @@ class RoundedButton(tk.Canvas):
             y1,
         ]
 
-    def _draw(self, fill_color):
-        self._current_bg = fill_color
-        self.delete("all")
-
-        points = self._rounded_points(1, 1, self._width - 1, self._height - 1, self._radius)
-        self._shape_id = self.create_polygon(points, smooth=True, fill=fill_color, outline=fill_color)
-
-        if self._text_anchor == "w":
-            text_x = 14
-            anchor = "w"
-        else:
-            text_x = self._width // 2
-            anchor = "center"
-
+    def _draw(self):
+        """Create the shape and label once; later changes only move or recolor them."""
+        self._shape_id = self.create_polygon(
+            self._shape_points(), smooth=True, fill=self._current_bg, outline=self._current_bg,
+        )
         self._text_id = self.create_text(
-            text_x,
-            self._height // 2,
+            *self._text_position(),
             text=self._text,
             fill=self._fg,
             font=self._font,
-            anchor=anchor,
+            anchor="w" if self._text_anchor == "w" else "center",
         )
 
+    def _shape_points(self):
+        return self._rounded_points(1, 1, self._width - 1, self._height - 1, self._radius)
+
+    def _text_position(self):
+        text_x = 14 if self._text_anchor == "w" else self._width // 2
+        return text_x, self._height // 2
+
+    def _set_fill(self, fill_color):
+        if fill_color != self._current_bg:
+            self._current_bg = fill_color
+            self.itemconfigure(self._shape_id, fill=fill_color, outline=fill_color)
+
     def _on_configure(self, event):
         if event.width <= 2 or event.height <= 2:
             return
+        if (event.width, event.height) == (self._width, self._height):
+            return
         self._width = event.width
         self._height = event.height
         self._radius = max(4, min(self._radius, self._height // 2, self._width // 2))
-        self._draw(self._current_bg)
+        self.coords(self._shape_id, self._shape_points())
+        self.coords(self._text_id, *self._text_position())
 
     def set_colors(self, bg=None, fg=None, hover_bg=None, active_bg=None):
         if bg is not None:
             self._normal_bg = bg
-        if fg is not None:
+        if fg is not None and fg != self._fg:
             self._fg = fg
+            self.itemconfigure(self._text_id, fill=fg)
         if hover_bg is not None:
             self._hover_bg = hover_bg
         if active_bg is not None:
             self._active_bg = active_bg
-        self._draw(self._normal_bg)
+        self._set_fill(self._normal_bg)
 
     def set_text(self, text):
         self._text = text
         self.itemconfigure(self._text_id, text=text)
 
     def set_font(self, font):
-        self._font = tkfont.Font(font=font)
-        self.itemconfigure(self._text_id, font=self._font)
+        font = _font_key(font)
+        if font != self._font:
+            self._font = font
+            self.itemconfigure(self._text_id, font=font)
 
     def set_disabled(self, disabled=True):
         self._disabled = disabled
         self.configure(cursor="arrow" if disabled else "hand2")
         if disabled:
-            self._draw(self._normal_bg)
+            self._set_fill(self._normal_bg)
 
     def _on_enter(self, _event):
         if self._disabled:
             return
-        self._draw(self._hover_bg)
+        self._set_fill(self._hover_bg)
 
     def _on_leave(self, _event):
         if self._disabled:
             return
         self._pressed_inside = False
-        self._draw(self._normal_bg)
+        self._set_fill(self._normal_bg)
 
     def _on_press(self, _event):
         if self._disabled:
             return
         self._pressed_inside = True
-        self._draw(self._active_bg)
+        self._set_fill(self._active_bg)
 
     def _on_release(self, event):
         if self._disabled:
             return
         inside = 0 <= event.x <= self._width and 0 <= event.y <= self._height
-        self._draw(self._hover_bg if inside else self._normal_bg)
+        self._set_fill(self._hover_bg if inside else self._normal_bg)
         if inside and self._pressed_inside and self._command:
             self._command()
         self._pressed_inside = False